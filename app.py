@@ -1,12 +1,14 @@
 import os
 from flask import Flask, render_template, send_from_directory
 from database.connection import init_db
+from services.telegram_delivery import start_worker as start_telegram_worker
 
 
 def create_app():
     app = Flask(__name__)
 
     init_db()
+    start_telegram_worker()
 
     # Register blueprints
     from blueprints.news_bp import news_bp
@@ -16,6 +18,7 @@ def create_app():
     from blueprints.macro_bp import macro_bp
     from blueprints.alerts_bp import alerts_bp
     from blueprints.company_bp import company_bp
+    from blueprints.cache_bp import cache_bp
 
     app.register_blueprint(news_bp)
     app.register_blueprint(financials_bp)
@@ -24,6 +27,7 @@ def create_app():
     app.register_blueprint(macro_bp)
     app.register_blueprint(alerts_bp)
     app.register_blueprint(company_bp)
+    app.register_blueprint(cache_bp)
 
     react_dir = os.path.join(app.static_folder, "react")
 
@@ -0,0 +1,69 @@
+"""
+Offline throughput benchmark for Claude sentiment scoring.
+Compares one-request-per-headline scoring with claude_sentiment_batch,
+using a stub client that simulates model latency.
+
+    python benchmarks/bench_claude_batch.py [--articles 60] [--latency 0.4]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.sentiment import claude_sentiment_batch  # noqa: E402
+
+
+class StubClient:
+    """Mimics anthropic.Anthropic().messages.create with a fixed base latency
+    plus a small per-headline cost, returning well-formed JSON.
+    """
+
+    def __init__(self, latency, per_item=0.01):
+        self.latency = latency
+        self.per_item = per_item
+        self.calls = 0
+        self.messages = self
+
+    def create(self, model, max_tokens, messages):
+        self.calls += 1
+        prompt = messages[0]["content"]
+        indices = [int(m) for m in re.findall(r"^(\d+)\. ", prompt, flags=re.M)]
+        count = max(len(indices), 1)
+        time.sleep(self.latency + self.per_item * count)
+        if indices:
+            text = json.dumps([{"i": i, "sentiment": "neutral", "score": 0.0, "reason": "stub"} for i in indices])
+        else:
+            text = json.dumps({"sentiment": "neutral", "score": 0.0, "reason": "stub"})
+        return type("Resp", (), {"content": [type("Block", (), {"text": text})()]})()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.4, help="simulated seconds per request")
+    args = parser.parse_args()
+
+    articles = [{"url": f"https://example.com/{i}", "title": f"Headline {i} moves markets"} for i in range(args.articles)]
+
+    stub = StubClient(args.latency)
+    start = time.perf_counter()
+    for art in articles:
+        claude_sentiment_batch([art], client=stub, batch_size=1, max_workers=1, use_cache=False)
+    sequential = time.perf_counter() - start
+    print(f"one per request : {sequential:6.2f}s  {stub.calls:3d} requests  {args.articles / sequential:7.1f} headlines/s")
+
+    stub = StubClient(args.latency)
+    start = time.perf_counter()
+    results = claude_sentiment_batch(articles, client=stub, use_cache=False)
+    batched = time.perf_counter() - start
+    assert all(r["method"] == "claude" for r in results)
+    print(f"batched         : {batched:6.2f}s  {stub.calls:3d} requests  {args.articles / batched:7.1f} headlines/s")
+    print(f"speedup         : {sequential / batched:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Form 4 parsing benchmark on a local corpus of XML documents.
+Compares the streaming parser (services.form4_parser) with the edgartools
+path used by filing.obj(): build the Form4 object, then extract trades from
+it. Both paths must produce the same trades before anything is timed. The
+edgartools side is skipped if it is not installed.
+edgartools also looks up each reporting owner on EDGAR while parsing; that
+lookup is stubbed out here so both sides measure local parsing only.
+
+    python benchmarks/bench_form4_parser.py [--dir benchmarks/fixtures/form4] [--repeat 200]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.form4_parser import parse_form4_xml, form4_trades  # noqa: E402
+from services.insiders import _trades_from_obj  # noqa: E402
+
+
+class _OfflineEntity:
+    """Stands in for edgar.Entity so owner parsing makes no network calls."""
+
+    def __init__(self, cik):
+        self.data = type("EntityData", (), {"is_company": False})()
+
+    def __bool__(self):
+        return True
+
+
+def _edgartools_parser():
+    """Return a function turning Form 4 XML into an edgartools Form4, or None."""
+    try:
+        from edgar.ownership import Form4, Ownership, owners
+    except ImportError:
+        return None
+    owners.Entity = _OfflineEntity
+    # Same construction filing.obj() uses for Form 4
+    return lambda xml: Form4(**Ownership.parse_xml(xml))
+
+
+def _run(label, documents, repeat, parse):
+    trades = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for xml in documents:
+            trades += len(parse(xml))
+    elapsed = time.perf_counter() - start
+    n = len(documents) * repeat
+    print(f"{label:<16}: {elapsed:7.3f}s  {n / elapsed:9.0f} filings/s  {trades // repeat} trades per pass")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dir", default=os.path.join(ROOT, "benchmarks", "fixtures", "form4"))
+    parser.add_argument("--repeat", type=int, default=200, help="passes over the corpus")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.dir, "*.xml")))
+    if not paths:
+        sys.exit(f"No .xml files in {args.dir}")
+    documents = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            documents.append(f.read())
+    print(f"{len(documents)} documents, {args.repeat} passes")
+
+    stream = lambda xml: form4_trades(parse_form4_xml(xml), accession_no="bench")  # noqa: E731
+    streaming = _run("streaming parser", documents, args.repeat, stream)
+
+    to_form4 = _edgartools_parser()
+    if to_form4 is None:
+        print("edgartools not installed; skipping the filing.obj() comparison")
+        return
+    for path, xml in zip(paths, documents):
+        if stream(xml) != _trades_from_obj(to_form4(xml), None, None, "bench"):
+            sys.exit(f"{os.path.basename(path)}: edgartools trades differ from the streaming parser")
+    print("trades match between both paths")
+    baseline = _run("edgartools obj()", documents, args.repeat,
+                    lambda xml: _trades_from_obj(to_form4(xml), None, None, "bench"))
+    print(f"speedup         : {baseline / streaming:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Statement serialization benchmark on synthetic frames shaped like yfinance and
+XBRL statements (line items x period columns, some missing cells).
+Compares services.frames.frame_to_dict with the previous per-cell loops of
+company_detail._df_to_dict and financials._statement_to_dict, and checks
+that both produce the same output.
+
+    python benchmarks/bench_frame_serializer.py [--rows 150] [--periods 5] [--repeat 50]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.company_detail import _df_to_dict  # noqa: E402
+from services.financials import _statement_to_dict  # noqa: E402
+
+
+def legacy_df_to_dict(df):
+    """company_detail._df_to_dict before services.frames."""
+    if df is None or df.empty:
+        return {}
+    result = {}
+    cols = [str(c)[:10] if hasattr(c, 'strftime') else str(c)[:10] for c in df.columns]
+    result["_periods"] = cols
+    for idx in df.index:
+        row_label = str(idx)
+        vals = []
+        for c in df.columns:
+            v = df.loc[idx, c]
+            try:
+                import math
+                if v is None or (isinstance(v, float) and math.isnan(v)):
+                    vals.append(None)
+                else:
+                    vals.append(float(v))
+            except (TypeError, ValueError):
+                vals.append(None)
+        result[row_label] = vals
+    return result
+
+
+def legacy_statement_to_dict(df):
+    """financials._statement_to_dict before services.frames (NaN cells came out as NaN)."""
+    result = {"_years": [str(col) for col in df.columns]}
+    for idx in df.index:
+        vals = []
+        for col in df.columns:
+            v = df.loc[idx, col]
+            if hasattr(v, 'item'):
+                vals.append(v.item())
+            elif v is None:
+                vals.append(None)
+            else:
+                try:
+                    vals.append(float(v))
+                except (ValueError, TypeError):
+                    vals.append(None)
+        result[str(idx)] = vals
+    return result
+
+
+def make_frame(rows, periods, missing, seed=0):
+    """A quarterly-statement-like frame: large values, Timestamp columns, NaN gaps."""
+    rng = np.random.default_rng(seed)
+    values = rng.normal(0, 5e9, size=(rows, periods)).round()
+    values[rng.random((rows, periods)) < missing] = np.nan
+    columns = pd.date_range(end="2025-12-31", periods=periods, freq="QE")[::-1]
+    index = [f"Line Item {i}" for i in range(rows)]
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+def _same(a, b):
+    """Equal, treating NaN and None as the same missing value."""
+    if a.keys() != b.keys():
+        return False
+    for key in a:
+        for x, y in zip(a[key], b[key]):
+            x = None if isinstance(x, float) and math.isnan(x) else x
+            y = None if isinstance(y, float) and math.isnan(y) else y
+            if x != y:
+                return False
+    return True
+
+
+def _run(label, frames, repeat, convert):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for df in frames:
+            convert(df)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36}: {elapsed * 1000 / (repeat * len(frames)):8.3f} ms/frame")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=150, help="line items per statement")
+    parser.add_argument("--periods", type=int, default=5, help="period columns per statement")
+    parser.add_argument("--missing", type=float, default=0.15, help="fraction of empty cells")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    frames = [make_frame(args.rows, args.periods, args.missing, seed) for seed in range(3)]
+    for df in frames:
+        if not _same(legacy_df_to_dict(df), _df_to_dict(df)):
+            sys.exit("company_detail output differs from the legacy serializer")
+        if not _same(legacy_statement_to_dict(df), _statement_to_dict(df)):
+            sys.exit("financials output differs from the legacy serializer")
+    print(f"{len(frames)} frames of {args.rows} rows x {args.periods} periods, {args.repeat} passes; outputs match")
+
+    old = _run("legacy company_detail._df_to_dict", frames, args.repeat, legacy_df_to_dict)
+    new = _run("company_detail._df_to_dict", frames, args.repeat, _df_to_dict)
+    print(f"speedup{'':<29}: {old / new:8.1f}x")
+    old = _run("legacy financials._statement_to_dict", frames, args.repeat, legacy_statement_to_dict)
+    new = _run("financials._statement_to_dict", frames, args.repeat, _statement_to_dict)
+    print(f"speedup{'':<29}: {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
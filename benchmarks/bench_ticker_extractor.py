@@ -0,0 +1,134 @@
+"""
+Ticker extraction benchmark: curated TICKER_MAP only vs the full issuer universe.
+Builds a synthetic company_tickers.json (or uses --issuers) that includes
+listed symbols which are also everyday headline words (NOW, CASH, GOLD...),
+then measures universe load time and memory, extraction throughput on a
+headline corpus, and how many plain-word headlines get tagged.
+
+    python benchmarks/bench_ticker_extractor.py [--issuers data/company_tickers.json] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import issuers, ticker_extractor  # noqa: E402
+from tickers import TICKER_MAP  # noqa: E402
+
+# Listed symbols that are ordinary words in headlines
+WORD_SYMBOLS = ["NOW", "ALL", "ONE", "OUT", "CAR", "AIR", "LIVE", "CASH", "GOLD", "TEAM", "MAIN", "SAFE"]
+
+TEMPLATES = [
+    "{name} shares rise after earnings beat estimates",
+    "{sym} falls as analysts cut targets on {name}",
+    "Why ${sym} could rally into year end",
+    "{name} ({sym}) announces buyback, stock climbs",
+    "Markets mixed as investors weigh Fed outlook; {name} in focus",
+    "(NASDAQ: {sym}) {name} reports record revenue",
+]
+
+# Headlines that mention no company; any tag here is a false positive
+PLAIN = [
+    "Stocks rally NOW as CASH piles up on the sidelines",
+    "GOLD hits record as investors seek SAFE havens",
+    "ALL eyes on the Fed: ONE rate cut or none?",
+    "AIR travel demand LIVE updates: CAR rentals OUT of stock",
+    "MAIN street TEAM effort lifts small caps",
+    "NEW YORK (AP) Wall Street drifts ahead of jobs data",
+]
+
+
+def synthetic_issuers(count, seed=0):
+    rng = random.Random(seed)
+    rows = [{"cik_str": 1000 + i, "ticker": sym, "title": f"{sym.title()} Holdings Inc"}
+            for i, sym in enumerate(WORD_SYMBOLS)]
+    seen = set(WORD_SYMBOLS) | set(TICKER_MAP)
+    while len(rows) < count:
+        sym = "".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(3, 5)))
+        if sym in seen:
+            continue
+        seen.add(sym)
+        suffix = rng.choice(["Holdings Inc", "Group Corp", "Therapeutics Inc", "Bancorp", "Technologies Ltd"])
+        # Like SEC titles, a share of names start with the same few words
+        prefix = rng.choice(["First ", "American ", "United ", "Global ", "", "", "", ""])
+        rows.append({"cik_str": 100000 + len(rows), "ticker": sym, "title": f"{prefix}{sym.title()} {suffix}"})
+    return {str(i): row for i, row in enumerate(rows)}
+
+
+def headlines(count, seed=1):
+    rng = random.Random(seed)
+    items = list(TICKER_MAP.items())
+    out = []
+    for _ in range(count):
+        sym, name = rng.choice(items)
+        out.append(rng.choice(TEMPLATES).format(sym=sym, name=name))
+    return out + PLAIN * (count // 50)
+
+
+def use_universe(path):
+    """Point the extractor at an issuer file (None: curated map only) and load it.
+    Returns (load seconds, peak bytes allocated while loading).
+    """
+    issuers.ISSUER_FILE = path or os.devnull + ".missing"
+    issuers._universe = None
+    ticker_extractor._name_index = None
+    tracemalloc.start()
+    start = time.perf_counter()
+    ticker_extractor._get_name_index()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(label, path, corpus, repeat):
+    load, peak = use_universe(path)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            ticker_extractor.extract_tickers(text)
+    elapsed = time.perf_counter() - start
+    tagged = {text: ticker_extractor.extract_tickers(text) for text in PLAIN}
+    false_positives = sum(len(t) for t in tagged.values())
+    print(f"{label:<14}: load {load * 1000:7.1f} ms, {peak / 2 ** 20:5.1f} MB peak; "
+          f"{len(corpus) * repeat / elapsed:9.0f} headlines/s; {false_positives} tags on plain headlines")
+    return elapsed, tagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--issuers", help="company_tickers.json to use instead of a synthetic one")
+    parser.add_argument("--count", type=int, default=10000, help="synthetic issuers")
+    parser.add_argument("--headlines", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    path = args.issuers
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(synthetic_issuers(args.count), f)
+
+    corpus = headlines(args.headlines)
+    print(f"{len(corpus)} headlines, {args.repeat} passes")
+    try:
+        curated, _ = run("curated only", None, corpus, args.repeat)
+        full, tagged = run("full universe", path, corpus, args.repeat)
+    finally:
+        if args.issuers is None:
+            os.remove(path)
+    print(f"throughput full/curated: {curated / full:6.2f}x")
+    for text, tickers in tagged.items():
+        if tickers:
+            print(f"  tagged {tickers} in: {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,15 +11,20 @@ def alerts_list():
 
 @alerts_bp.route("/api/alerts/create", methods=["POST"])
 def alerts_create():
-    data = request.get_json(force=True)
-    name = data.get("name", "").strip()
-    alert_type = data.get("alert_type", "").strip()
-    config = data.get("config", {})
+    data = request.get_json(force=True, silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON object body required"}), 400
+    name = str(data.get("name") or "").strip()
+    alert_type = str(data.get("alert_type") or "").strip()
+    config = data.get("config") or {}
 
     if not name or not alert_type:
         return jsonify({"error": "name and alert_type required"}), 400
 
-    result = create_alert(name, alert_type, config)
+    try:
+        result = create_alert(name, alert_type, config)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     if "error" in result:
         return jsonify(result), 500
     return jsonify(result), 201
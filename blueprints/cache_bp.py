@@ -0,0 +1,9 @@
+from flask import Blueprint, jsonify
+from services.cache import cache_stats
+
+cache_bp = Blueprint("cache", __name__)
+
+
+@cache_bp.route("/api/cache/stats")
+def cache_stats_view():
+    return jsonify(cache_stats())
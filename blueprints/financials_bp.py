@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
-from services.financials import lookup_financials, compare_financials
+from services.financials import lookup_financials, compare_financials, financial_history, HISTORY_FORMS
+from services.fundamentals import valid_ticker
 
 financials_bp = Blueprint("financials", __name__)
 
@@ -29,3 +30,29 @@ def financials_compare():
 
     data = compare_financials(tickers)
     return jsonify(data)
+
+
+@financials_bp.route("/api/financials/history")
+def financials_history():
+    ticker = request.args.get("ticker", "").strip().upper()
+    if not ticker:
+        return jsonify({"error": "ticker required"}), 400
+    if not valid_ticker(ticker):
+        return jsonify({"error": "invalid ticker"}), 400
+
+    freq = request.args.get("freq", "annual")
+    if freq not in HISTORY_FORMS:
+        return jsonify({"error": f"freq must be one of: {', '.join(HISTORY_FORMS)}"}), 400
+    raw = request.args.get("metrics", "")
+    metrics = [m.strip() for m in raw.split(",") if m.strip()] or None
+    try:
+        years = int(request.args.get("years", "10"))
+    except ValueError:
+        return jsonify({"error": "years must be an integer"}), 400
+    if years < 1:
+        return jsonify({"error": "years must be at least 1"}), 400
+
+    data = financial_history(ticker, freq=freq, metrics=metrics, years=years)
+    if "error" in data:
+        return jsonify(data), 404
+    return jsonify(data)
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from services.insiders import get_insider_trades, detect_clusters
+from config import INSIDER_CLUSTER_MIN_INSIDERS
 
 insiders_bp = Blueprint("insiders", __name__)
 
@@ -23,5 +24,16 @@ def insider_trades():
 
 @insiders_bp.route("/api/insiders/clusters")
 def insider_clusters():
-    data = detect_clusters()
+    try:
+        days = int(request.args.get("days", "30"))
+        min_insiders = int(request.args.get("min_insiders", "3"))
+    except ValueError:
+        return jsonify({"error": "days and min_insiders must be integers"}), 400
+    if days < 1:
+        return jsonify({"error": "days must be at least 1"}), 400
+    # Clusters are materialized at the configured minimum, so fewer buyers can't be listed
+    if min_insiders < INSIDER_CLUSTER_MIN_INSIDERS:
+        return jsonify({"error": f"min_insiders must be at least {INSIDER_CLUSTER_MIN_INSIDERS}"}), 400
+
+    data = detect_clusters(days=days, min_insiders=min_insiders)
     return jsonify(data)
@@ -1,15 +1,47 @@
 from flask import Blueprint, request, jsonify
 from services.brave_news import search_news_multi
-from services.ticker_extractor import extract_tickers_from_articles
+from services.news_store import ingest_articles, list_articles
 from services.stock_data import get_multiple_stocks
-from services.sentiment import score_articles, claude_sentiment, claude_sentiment_available
-from config import DEFAULT_QUERIES
+from services.ticker_sentiment import get_ticker_sentiment
+from services.sentiment import (
+    claude_sentiment, claude_sentiment_available, claude_sentiment_batch, cached_claude_sentiments,
+)
+from config import DEFAULT_QUERIES, CLAUDE_MAX_ARTICLES
 
 news_bp = Blueprint("news", __name__)
 
+ARTICLE_FIELDS = ("url", "title", "description")
+
+
+def _article_list_error(articles):
+    """Why an `articles` payload can't be scored, or None if it's usable."""
+    if not isinstance(articles, list):
+        return "articles must be a list"
+    if len(articles) > CLAUDE_MAX_ARTICLES:
+        return f"at most {CLAUDE_MAX_ARTICLES} articles per request"
+    for art in articles:
+        if not isinstance(art, dict):
+            return "each article must be an object"
+        if any(not isinstance(art.get(f), (str, type(None))) for f in ARTICLE_FIELDS):
+            return "article url, title and description must be strings"
+    return None
+
 
 @news_bp.route("/api/news")
 def api_news():
+    # Stored history, paged with ?source=store&limit=50&cursor=<next_cursor>
+    if request.args.get("source") == "store":
+        try:
+            limit = min(max(int(request.args.get("limit", 50)), 1), 200)
+            cursor = request.args.get("cursor")
+            cursor = int(cursor) if cursor else None
+        except ValueError:
+            return jsonify({"error": "limit and cursor must be integers"}), 400
+
+        data = list_articles(limit=limit, cursor=cursor)
+        data["claude_available"] = claude_sentiment_available()
+        return jsonify(data)
+
     q = request.args.get("q", "").strip()
     freshness = request.args.get("freshness", "pd")
 
@@ -19,8 +51,7 @@ def api_news():
         queries = DEFAULT_QUERIES
 
     articles = search_news_multi(queries=queries, freshness=freshness)
-    articles, all_tickers = extract_tickers_from_articles(articles)
-    articles = score_articles(articles)
+    articles, all_tickers = ingest_articles(articles)
 
     return jsonify({
         "articles": articles,
@@ -42,13 +73,29 @@ def api_stocks():
 
 @news_bp.route("/api/news/sentiment/claude", methods=["POST"])
 def api_claude_sentiment():
-    """Get Claude-enhanced sentiment for a single headline."""
-    data = request.get_json(force=True)
+    """Get Claude-enhanced sentiment for one headline ({text, url}) or for a
+    whole page of articles ({articles: [{url, title, description}]}).
+    """
+    data = request.get_json(force=True, silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON object body required"}), 400
+
+    articles = data.get("articles")
+    if articles is not None:
+        error = _article_list_error(articles)
+        if error is None and not articles:
+            error = "articles must be a non-empty list"
+        if error:
+            return jsonify({"error": error}), 400
+        if not claude_sentiment_available():
+            return jsonify({"error": "API key not configured"}), 503
+        return jsonify({"results": claude_sentiment_batch(articles)})
+
     text = data.get("text", "")
-    if not text:
+    if not text or not isinstance(text, str):
         return jsonify({"error": "text required"}), 400
 
-    label, score, reason = claude_sentiment(text)
+    label, score, reason = claude_sentiment(text, url=data.get("url"))
     if label is None:
         return jsonify({"error": reason}), 503
 
@@ -57,3 +104,26 @@ def api_claude_sentiment():
         "score": score,
         "reason": reason,
     })
+
+
+@news_bp.route("/api/news/sentiment/cached", methods=["POST"])
+def api_cached_sentiment():
+    """Return stored Claude sentiment for a list of articles ({url, title})."""
+    data = request.get_json(force=True, silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON object body required"}), 400
+    articles = data.get("articles", [])
+    error = _article_list_error(articles)
+    if error:
+        return jsonify({"error": error}), 400
+
+    return jsonify({"results": cached_claude_sentiments(articles)})
+
+
+@news_bp.route("/api/news/sentiment/ticker/<ticker>")
+def api_ticker_sentiment(ticker):
+    """Rolling news sentiment for a ticker (?window=24h|7d|30d)."""
+    data = get_ticker_sentiment(ticker.strip().upper(), window=request.args.get("window", "24h"))
+    if "error" in data:
+        return jsonify(data), 400
+    return jsonify(data)
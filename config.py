@@ -9,6 +9,21 @@ ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 FRED_API_KEY = os.getenv("FRED_API_KEY", "")
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
+EDGAR_IDENTITY = os.getenv("EDGAR_IDENTITY", "")  # "Name email", required by SEC for direct downloads
+
+# --- Alerts ---
+ALERT_COOLDOWN = 3600      # seconds before the same alert can fire again
+TELEGRAM_POLL_INTERVAL = 5       # seconds between delivery queue scans
+TELEGRAM_MAX_ATTEMPTS = 6        # give up on a message after this many failures
+TELEGRAM_RETRY_BASE = 5          # seconds; doubled on each failed attempt
+TELEGRAM_CHAT_INTERVAL = 1.0     # min seconds between messages to one chat
+TELEGRAM_GLOBAL_INTERVAL = 1 / 30  # bot-wide limit of ~30 messages/second
+TELEGRAM_CLAIM_LEASE = 300       # seconds a worker owns claimed alerts before others may retry them
+
+# --- Issuer Universe ---
+# SEC company_tickers.json (https://www.sec.gov/files/company_tickers.json).
+# Optional: without it, ticker extraction uses the curated map in tickers.py.
+ISSUER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "company_tickers.json")
 
 # --- Brave News ---
 BRAVE_NEWS_URL = "https://api.search.brave.com/res/v1/news/search"
@@ -18,6 +33,16 @@ DEFAULT_QUERIES = [
     "Wall Street equities",
     "S&P 500 Nasdaq Dow Jones news",
 ]
+NEWS_FETCH_WORKERS = 4     # concurrent Brave queries / pooled connections
+
+# --- Claude Sentiment ---
+CLAUDE_BATCH_SIZE = 25     # headlines per model request
+CLAUDE_BATCH_WORKERS = 4   # concurrent model requests
+CLAUDE_MAX_ARTICLES = 200  # articles accepted per sentiment request (one news page)
+
+# --- Per-Ticker Sentiment ---
+SENTIMENT_BUCKET_SECONDS = 3600        # 1-hour aggregation buckets
+SENTIMENT_EWMA_HALFLIFE = 6 * 3600     # weight of a score halves every 6 hours
 
 # --- Cache TTLs (seconds) ---
 NEWS_CACHE_TTL = 300       # 5 minutes
@@ -28,6 +53,52 @@ INSIDER_CACHE_TTL = 1800   # 30 minutes
 MACRO_CACHE_TTL = 3600     # 1 hour
 DETAIL_CACHE_TTL = 300     # 5 minutes
 
+# --- Cache Limits ---
+# Per-namespace bounds for services.cache (LRU eviction past either limit).
+# max_stale: seconds past the TTL an entry may still be served while it is
+# refreshed in the background; after that, callers block on a fresh load.
+_MB = 1024 * 1024
+CACHE_CONFIG = {
+    "stocks": {"ttl": STOCK_CACHE_TTL, "max_stale": 600, "max_entries": 5000, "max_bytes": 4 * _MB},
+    "news": {"ttl": NEWS_CACHE_TTL, "max_stale": 1800, "max_entries": 200, "max_bytes": 16 * _MB},
+    "financials": {"ttl": FINANCIAL_CACHE_TTL, "max_stale": 86400, "max_entries": 200, "max_bytes": 64 * _MB},
+    "screener": {"ttl": SCREENER_CACHE_TTL, "max_stale": 14400, "max_entries": 100, "max_bytes": 32 * _MB},
+    "insiders": {"ttl": INSIDER_CACHE_TTL, "max_stale": 21600, "max_entries": 500, "max_bytes": 32 * _MB},
+    "macro": {"ttl": MACRO_CACHE_TTL, "max_stale": 86400, "max_entries": 50, "max_bytes": 8 * _MB},
+    "detail": {"ttl": DETAIL_CACHE_TTL, "max_stale": 1800, "max_entries": 200, "max_bytes": 64 * _MB},
+}
+CACHE_REFRESH_WORKERS = 4  # background stale-while-revalidate threads
+
+# --- Stock Quotes ---
+STOCK_BATCH_SIZE = 200     # symbols per bulk quote download
+
+# --- Insiders (SEC EDGAR) ---
+SEC_REQUESTS_PER_SECOND = 10  # SEC fair-access limit, shared by all EDGAR calls
+INSIDER_TICKER_WORKERS = 6    # tickers scanned concurrently by detect_clusters
+INSIDER_FILING_WORKERS = 8    # Form 4 filings parsed concurrently
+INSIDER_SCAN_DEADLINE = 45    # seconds before detect_clusters returns partial results
+INSIDER_BACKFILL_DAYS = 365   # history fetched the first time a ticker is synced
+INSIDER_SYNC_MAX_FILINGS = 100  # newest Form 4 filings examined per sync
+INSIDER_CLUSTER_WINDOW_DAYS = 30  # buys this close together count toward one cluster
+INSIDER_CLUSTER_MIN_INSIDERS = 3  # distinct buyers needed for a cluster
+
+# EDGAR form index files for bulk Form 4 ingestion. When EDGAR_INDEX_DIR is
+# set, index files are read from it using the Archives layout
+# (edgar/daily-index/..., edgar/full-index/...) instead of being downloaded.
+EDGAR_ARCHIVES_URL = "https://www.sec.gov/Archives"
+EDGAR_INDEX_DIR = os.getenv("EDGAR_INDEX_DIR", "")
+INSIDER_INGEST_CHUNK = 500    # filings parsed and stored per batch during bulk ingestion
+
+# --- Financials (SEC EDGAR) ---
+FINANCIAL_FILING_CHECK_INTERVAL = 86400  # seconds between checks for a newer 10-K
+FINANCIAL_COMPARE_WORKERS = 8    # tickers resolved concurrently by compare_financials
+FINANCIAL_PARSE_WORKERS = min(4, os.cpu_count() or 1)  # XBRL parsing processes
+FINANCIAL_COMPARE_DEADLINE = 60  # seconds before a comparison returns partial results
+
+# Multi-year fundamentals store (services.fundamentals)
+FUNDAMENTALS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "fundamentals")
+FUNDAMENTALS_MAX_FILINGS = {"annual": 12, "quarterly": 40}  # history backfilled per ticker
+
 # --- FRED Series ---
 FRED_SERIES = {
     "growth": {
@@ -1,5 +1,5 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, scoped_session
 from database.models import Base
 
@@ -13,6 +13,26 @@ Session = scoped_session(sessionmaker(bind=engine))
 
 def init_db():
     Base.metadata.create_all(engine)
+    _upgrade_tables()
+
+
+def _upgrade_tables():
+    """Add model columns and indexes missing from tables created by an older
+    version. create_all() only creates missing tables, never alters existing ones.
+    """
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name not in existing:
+                    col_type = col.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}"))
+
+            existing_indexes = {i["name"] for i in insp.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
 
 
 def get_session():
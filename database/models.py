@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, Text, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -7,10 +7,16 @@ Base = declarative_base()
 
 class CachedFinancial(Base):
     __tablename__ = "cached_financials"
+    __table_args__ = (
+        Index("ix_cached_financials_ticker_accession", "ticker", "accession_no", unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     ticker = Column(String(10), index=True, nullable=False)
     data_json = Column(Text, nullable=False)
+    accession_no = Column(String(25))  # 10-K the data was parsed from
+    filing_date = Column(DateTime)
+    checked_at = Column(DateTime)      # last time this was confirmed as the latest 10-K
     fetched_at = Column(DateTime, default=datetime.utcnow)
 
 
@@ -25,6 +31,10 @@ class ScreenerResult(Base):
 
 class InsiderTrade(Base):
     __tablename__ = "insider_trades"
+    __table_args__ = (
+        Index("ix_insider_trades_ticker_filing_date", "ticker", "filing_date"),
+        Index("ix_insider_trades_accession_txn", "accession_no", "txn_index", unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     ticker = Column(String(10), index=True, nullable=False)
@@ -35,9 +45,35 @@ class InsiderTrade(Base):
     price = Column(Float)
     value = Column(Float)
     filing_date = Column(DateTime)
+    accession_no = Column(String(25))
+    txn_index = Column(Integer)  # position of the transaction within the filing
     fetched_at = Column(DateTime, default=datetime.utcnow)
 
 
+class InsiderSyncState(Base):
+    __tablename__ = "insider_sync_state"
+
+    id = Column(Integer, primary_key=True)
+    ticker = Column(String(10), unique=True, nullable=False)
+    last_accession = Column(String(25))
+    last_filing_date = Column(DateTime)
+    synced_at = Column(DateTime)
+
+
+class InsiderCluster(Base):
+    __tablename__ = "insider_clusters"
+    __table_args__ = (Index("ix_insider_clusters_ticker_start", "ticker", "start_date"),)
+
+    id = Column(Integer, primary_key=True)
+    ticker = Column(String(10), nullable=False)
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False, index=True)
+    insider_count = Column(Integer)
+    total_value = Column(Float)
+    trades_json = Column(Text)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
 class MacroSnapshot(Base):
     __tablename__ = "macro_snapshots"
 
@@ -67,7 +103,14 @@ class AlertLog(Base):
     id = Column(Integer, primary_key=True)
     alert_id = Column(Integer, index=True, nullable=False)
     message = Column(Text)
-    delivered = Column(Boolean, default=False)
+    chat_id = Column(String(50))
+    delivered = Column(Boolean, default=False, index=True)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime)
+    last_error = Column(Text)
+    claimed_by = Column(String(64))
+    claimed_at = Column(DateTime)
+    delivered_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
@@ -78,5 +121,39 @@ class SentimentCache(Base):
     url_hash = Column(String(64), unique=True, nullable=False)
     sentiment = Column(String(20))
     score = Column(Float)
+    reason = Column(Text)
     method = Column(String(20))
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class NewsArticle(Base):
+    __tablename__ = "news_articles"
+
+    id = Column(Integer, primary_key=True)
+    url_hash = Column(String(64), unique=True, nullable=False)
+    url = Column(Text, nullable=False)
+    title = Column(Text)
+    description = Column(Text)
+    source = Column(String(200))
+    age = Column(String(50))
+    thumbnail = Column(Text)
+    tickers_json = Column(Text)
+    sentiment = Column(String(20))
+    sentiment_score = Column(Float)
+    fetched_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class TickerSentimentBucket(Base):
+    __tablename__ = "ticker_sentiment_buckets"
+    __table_args__ = (UniqueConstraint("ticker", "bucket_start"),)
+
+    id = Column(Integer, primary_key=True)
+    ticker = Column(String(10), index=True, nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    count = Column(Integer, default=0)
+    bullish = Column(Integer, default=0)
+    bearish = Column(Integer, default=0)
+    score_sum = Column(Float, default=0.0)
+    ewm_num = Column(Float, default=0.0)
+    ewm_den = Column(Float, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -8,6 +8,13 @@ export function fetchNews(params: { q?: string; freshness?: string } = {}): Prom
   return apiGet<NewsResponse>(`/api/news?${sp}`)
 }
 
+export function fetchNewsHistory(params: { limit?: number; cursor?: number | null } = {}): Promise<NewsResponse> {
+  const sp = new URLSearchParams({ source: 'store' })
+  if (params.limit) sp.set('limit', String(params.limit))
+  if (params.cursor) sp.set('cursor', String(params.cursor))
+  return apiGet<NewsResponse>(`/api/news?${sp}`)
+}
+
 export function fetchStocks(tickers: string[]): Promise<Record<string, unknown>> {
   return apiGet(`/api/stocks?tickers=${encodeURIComponent(tickers.join(','))}`)
 }
@@ -15,3 +22,7 @@ export function fetchStocks(tickers: string[]): Promise<Record<string, unknown>>
 export function claudeSentiment(articles: { url: string; title: string }[]): Promise<unknown> {
   return apiPost('/api/news/sentiment/claude', { articles })
 }
+
+export function cachedSentiment(articles: { url: string; title: string }[]): Promise<unknown> {
+  return apiPost('/api/news/sentiment/cached', { articles })
+}
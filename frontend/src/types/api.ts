@@ -12,6 +12,8 @@ export interface Article {
 
 export interface NewsResponse {
   articles: Article[]
+  tickers?: string[]
+  next_cursor?: number | null
 }
 
 export interface StockQuote {
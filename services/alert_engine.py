@@ -0,0 +1,271 @@
+"""
+Background alert evaluation.
+Enabled alerts are loaded once and indexed by ticker and alert type. Quote,
+news and insider refreshes queue events for a worker thread, which evaluates
+only the alerts for the tickers in each event and writes AlertLog rows in bulk.
+"""
+import json
+import math
+import queue
+import threading
+from datetime import datetime, timedelta
+from config import ALERT_COOLDOWN
+from database.connection import get_session
+from database.models import Alert, AlertLog
+from services import telegram_delivery
+
+ANY_TICKER = "*"
+
+# alert_type -> event kind that can trigger it
+ALERT_EVENTS = {
+    "price_above": "quotes",
+    "price_below": "quotes",
+    "sentiment_bullish": "news",
+    "sentiment_bearish": "news",
+    "insider_cluster": "insiders",
+}
+
+DEFAULT_THRESHOLDS = {
+    "sentiment_bullish": 0.5,
+    "sentiment_bearish": 0.5,
+    "insider_cluster": 3,
+}
+
+
+# Alert types that never fire without a threshold
+THRESHOLD_REQUIRED = {"price_above", "price_below"}
+
+
+def parse_alert_config(alert_type, config):
+    """Validate an alert's type and config.
+    Returns (ticker, threshold); raises ValueError describing the problem.
+    """
+    if alert_type not in ALERT_EVENTS:
+        raise ValueError(f"Unknown alert_type: {alert_type} (use {', '.join(ALERT_EVENTS)})")
+    if not isinstance(config, dict):
+        raise ValueError("config must be an object")
+
+    ticker = config.get("ticker") or ""
+    if not isinstance(ticker, str):
+        raise ValueError("config.ticker must be a string")
+
+    threshold = config.get("threshold")
+    if threshold is None or threshold == "":
+        if alert_type in THRESHOLD_REQUIRED:
+            raise ValueError(f"{alert_type} alerts need a threshold")
+        threshold = DEFAULT_THRESHOLDS.get(alert_type)
+    else:
+        if isinstance(threshold, bool):
+            raise ValueError("config.threshold must be a number")
+        try:
+            threshold = float(threshold)
+        except (TypeError, ValueError):
+            raise ValueError("config.threshold must be a number")
+        if not math.isfinite(threshold):
+            raise ValueError("config.threshold must be a finite number")
+
+    return ticker.strip().upper() or ANY_TICKER, threshold
+
+
+class _IndexedAlert:
+    __slots__ = ("id", "name", "alert_type", "ticker", "threshold", "config", "last_triggered")
+
+    def __init__(self, alert):
+        config = json.loads(alert.config_json) if alert.config_json else {}
+        self.id = alert.id
+        self.name = alert.name
+        self.alert_type = alert.alert_type
+        self.ticker, self.threshold = parse_alert_config(alert.alert_type, config)
+        self.config = config
+        self.last_triggered = alert.last_triggered
+
+
+class AlertEngine:
+    def __init__(self):
+        self._index = None  # event kind -> ticker -> [_IndexedAlert]
+        self._index_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    # --- Index ---
+
+    def invalidate(self):
+        """Drop the alert index; it is rebuilt on the next evaluation."""
+        with self._index_lock:
+            self._index = None
+
+    def _get_index(self):
+        with self._index_lock:
+            if self._index is None:
+                session = get_session()
+                try:
+                    alerts = session.query(Alert).filter(Alert.enabled == True).all()
+                    index = {}
+                    for alert in alerts:
+                        kind = ALERT_EVENTS.get(alert.alert_type)
+                        if kind is None:
+                            continue
+                        try:
+                            a = _IndexedAlert(alert)
+                        except ValueError as e:
+                            # One bad row must not disable every other alert
+                            print(f"[alert_engine] Skipping alert {alert.id} ({alert.name}): {e}")
+                            continue
+                        index.setdefault(kind, {}).setdefault(a.ticker, []).append(a)
+                    self._index = index
+                finally:
+                    session.close()
+            return self._index
+
+    def _candidates(self, kind, tickers):
+        """Yield (ticker, alert) for alerts on the given tickers plus ticker-less ones."""
+        by_ticker = self._get_index().get(kind)
+        if not by_ticker:
+            return
+        wildcard = by_ticker.get(ANY_TICKER, ())
+        for ticker in tickers:
+            for alert in by_ticker.get(ticker, ()):
+                yield ticker, alert
+            for alert in wildcard:
+                yield ticker, alert
+
+    # --- Events ---
+
+    def submit(self, kind, payload):
+        """Queue an event for background evaluation."""
+        self._ensure_started()
+        self._queue.put((kind, payload))
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="alert-engine", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            kind, payload = self._queue.get()
+            try:
+                self.evaluate(kind, payload)
+            except Exception as e:
+                print(f"[alert_engine] Error evaluating {kind} event: {e}")
+
+    # --- Evaluation ---
+
+    def evaluate(self, kind, payload, now=None):
+        """Evaluate alerts touched by one event and persist any triggers.
+        Returns the list of (alert_id, message) that fired.
+        """
+        now = now or datetime.utcnow()
+        if kind == "quotes":
+            fired = self._eval_quotes(payload)
+        elif kind == "news":
+            fired = self._eval_news(payload)
+        elif kind == "insiders":
+            fired = self._eval_insiders(payload)
+        else:
+            raise ValueError(f"Unknown alert event: {kind}")
+
+        cooldown = timedelta(seconds=ALERT_COOLDOWN)
+        due = []
+        seen = set()
+        for alert, message in fired:
+            if alert.id in seen:
+                continue
+            if alert.last_triggered and now - alert.last_triggered < cooldown:
+                continue
+            seen.add(alert.id)
+            due.append((alert, message))
+
+        if due:
+            self._record(due, now)
+            telegram_delivery.wake()
+        return [(alert.id, message) for alert, message in due]
+
+    def _eval_quotes(self, quotes):
+        fired = []
+        for ticker, alert in self._candidates("quotes", quotes.keys()):
+            price = quotes[ticker].get("price")
+            if price is None or alert.threshold is None:
+                continue
+            if alert.alert_type == "price_above" and price >= alert.threshold:
+                fired.append((alert, f"<b>{alert.name}</b>\n{ticker} at ${price:,.2f} is above ${alert.threshold:,.2f}"))
+            elif alert.alert_type == "price_below" and price <= alert.threshold:
+                fired.append((alert, f"<b>{alert.name}</b>\n{ticker} at ${price:,.2f} is below ${alert.threshold:,.2f}"))
+        return fired
+
+    def _eval_news(self, articles):
+        scores = {}
+        for art in articles:
+            for ticker in art.get("tickers", []):
+                scores.setdefault(ticker, []).append(art.get("sentiment_score") or 0.0)
+
+        fired = []
+        for ticker, alert in self._candidates("news", scores.keys()):
+            ticker_scores = scores[ticker]
+            mean = sum(ticker_scores) / len(ticker_scores)
+            n = len(ticker_scores)
+            if alert.alert_type == "sentiment_bullish" and mean >= alert.threshold:
+                fired.append((alert, f"<b>{alert.name}</b>\n{ticker} bullish news: mean score {mean:+.2f} over {n} new article(s)"))
+            elif alert.alert_type == "sentiment_bearish" and mean <= -alert.threshold:
+                fired.append((alert, f"<b>{alert.name}</b>\n{ticker} bearish news: mean score {mean:+.2f} over {n} new article(s)"))
+        return fired
+
+    def _eval_insiders(self, clusters):
+        by_ticker = {c["ticker"]: c for c in clusters}
+        fired = []
+        for ticker, alert in self._candidates("insiders", by_ticker.keys()):
+            cluster = by_ticker[ticker]
+            if cluster.get("insider_count", 0) >= alert.threshold:
+                fired.append((alert, (
+                    f"<b>{alert.name}</b>\n{ticker}: {cluster['insider_count']} insiders bought "
+                    f"${cluster.get('total_value', 0):,.0f} within 30 days"
+                )))
+        return fired
+
+    def _record(self, due, now):
+        session = get_session()
+        try:
+            session.add_all([
+                AlertLog(alert_id=alert.id, message=message, chat_id=alert.config.get("chat_id"), created_at=now)
+                for alert, message in due
+            ])
+            session.query(Alert).filter(Alert.id.in_([alert.id for alert, _ in due])).update(
+                {Alert.last_triggered: now}, synchronize_session=False,
+            )
+            session.commit()
+            for alert, _ in due:
+                alert.last_triggered = now
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+
+engine = AlertEngine()
+
+
+def notify_quotes(quotes):
+    """Queue refreshed quotes ({ticker: quote}) for alert evaluation."""
+    if quotes:
+        engine.submit("quotes", quotes)
+
+
+def notify_news(articles):
+    """Queue newly ingested, annotated articles for alert evaluation."""
+    if articles:
+        engine.submit("news", articles)
+
+
+def notify_insider_clusters(clusters):
+    """Queue detected insider buying clusters for alert evaluation."""
+    if clusters:
+        engine.submit("insiders", clusters)
+
+
+def invalidate_alerts():
+    """Call after alerts are created, changed or deleted."""
+    engine.invalidate()
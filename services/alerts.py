@@ -3,35 +3,25 @@ Alert management with optional Telegram delivery.
 Web UI always works; Telegram delivery only if bot token + chat ID are configured.
 """
 import json
-import requests
 from datetime import datetime
-from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from config import TELEGRAM_CHAT_ID
 from database.connection import get_session
 from database.models import Alert, AlertLog
-
-
-def telegram_configured():
-    """Check if Telegram delivery is available."""
-    return bool(TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID)
+from services.alert_engine import invalidate_alerts, parse_alert_config
+from services.telegram_delivery import telegram_configured, post_message, TelegramError
 
 
 def send_telegram(message):
-    """Send a message via Telegram bot."""
+    """Send a message via Telegram bot right away (triggered alerts are
+    delivered by the background queue in services.telegram_delivery).
+    """
     if not telegram_configured():
         return False, "Telegram not configured (TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID required)"
 
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": TELEGRAM_CHAT_ID,
-        "text": message,
-        "parse_mode": "HTML",
-    }
-
     try:
-        resp = requests.post(url, json=payload, timeout=10)
-        resp.raise_for_status()
+        post_message(TELEGRAM_CHAT_ID, message)
         return True, "Message sent"
-    except requests.RequestException as e:
+    except TelegramError as e:
         return False, str(e)
 
 
@@ -60,7 +50,9 @@ def list_alerts():
 
 
 def create_alert(name, alert_type, config):
-    """Create a new alert."""
+    """Create a new alert. Raises ValueError for an invalid type or config."""
+    parse_alert_config(alert_type, config)
+
     session = get_session()
     try:
         alert = Alert(
@@ -71,6 +63,7 @@ def create_alert(name, alert_type, config):
         )
         session.add(alert)
         session.commit()
+        invalidate_alerts()
         return {"id": alert.id, "name": alert.name, "alert_type": alert.alert_type}
     except Exception as e:
         session.rollback()
@@ -88,6 +81,7 @@ def delete_alert(alert_id):
             return {"error": "Alert not found"}
         session.delete(alert)
         session.commit()
+        invalidate_alerts()
         return {"deleted": True}
     except Exception as e:
         session.rollback()
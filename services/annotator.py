@@ -0,0 +1,32 @@
+"""
+Single-pass article annotation.
+Each article's title + description is lowercased and tokenized once and the
+same tokens feed both ticker extraction and keyword sentiment. Callers only
+pass articles that are not yet stored (see news_store.ingest_articles); the
+stored row is the memo for everything seen before.
+"""
+from services.sentiment import keyword_sentiment
+from services.ticker_extractor import extract_tickers, tokenize
+
+
+def _annotate(text):
+    text_lower = text.lower()
+    tokens = tokenize(text_lower)
+    tickers = extract_tickers(text, tokens=tokens)
+    label, score = keyword_sentiment(text, text_lower=text_lower, words=tokens)
+    return tickers, label, score
+
+
+def annotate_articles(articles):
+    """Add 'tickers', 'sentiment' and 'sentiment_score' to each article dict.
+    Returns (articles, all_tickers) like extract_tickers_from_articles.
+    """
+    all_tickers = set()
+    for art in articles:
+        text = f"{art.get('title', '')} {art.get('description', '')}"
+        tickers, label, score = _annotate(text)
+        art["tickers"] = list(tickers)
+        art["sentiment"] = label
+        art["sentiment_score"] = score
+        all_tickers.update(tickers)
+    return articles, list(all_tickers)
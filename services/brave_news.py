@@ -1,8 +1,21 @@
-import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from config import BRAVE_API_KEY, BRAVE_NEWS_URL, NEWS_CACHE_TTL, DEFAULT_QUERIES
+from requests.adapters import HTTPAdapter
+from config import BRAVE_API_KEY, BRAVE_NEWS_URL, DEFAULT_QUERIES, NEWS_FETCH_WORKERS
+from services.cache import get_cache
 
-_cache = {}
+_cache = get_cache("news")
+
+# One keep-alive session shared by all fetches so repeat queries reuse the
+# TCP/TLS connection instead of handshaking each time.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=NEWS_FETCH_WORKERS))
+_session.headers.update({
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip",
+})
+
+_pool = ThreadPoolExecutor(max_workers=NEWS_FETCH_WORKERS, thread_name_prefix="brave-news")
 
 
 def _cache_key(query, freshness, count):
@@ -11,15 +24,17 @@ def _cache_key(query, freshness, count):
 
 def fetch_news(query, freshness="pd", count=20):
     key = _cache_key(query, freshness, count)
-    now = time.time()
-    if key in _cache and now - _cache[key]["ts"] < NEWS_CACHE_TTL:
-        return _cache[key]["data"]
-
-    headers = {
-        "Accept": "application/json",
-        "Accept-Encoding": "gzip",
-        "X-Subscription-Token": BRAVE_API_KEY,
-    }
+    results = _cache.get_or_load(
+        key,
+        lambda: _fetch_news(query, freshness, count),
+        cacheable=lambda r: r is not None,
+    )
+    return results if results is not None else []
+
+
+def _fetch_news(query, freshness, count):
+    """Query Brave News. Returns None on request failure so it is not cached."""
+    headers = {"X-Subscription-Token": BRAVE_API_KEY}
     params = {
         "q": query,
         "count": count,
@@ -29,12 +44,12 @@ def fetch_news(query, freshness="pd", count=20):
     }
 
     try:
-        resp = requests.get(BRAVE_NEWS_URL, headers=headers, params=params, timeout=10)
+        resp = _session.get(BRAVE_NEWS_URL, headers=headers, params=params, timeout=10)
         resp.raise_for_status()
         data = resp.json()
     except requests.RequestException as e:
         print(f"[brave_news] Error fetching news for '{query}': {e}")
-        return []
+        return None
 
     results = []
     for item in data.get("results", []):
@@ -49,19 +64,27 @@ def fetch_news(query, freshness="pd", count=20):
             "thumbnail": (item.get("thumbnail", {}) or {}).get("src", ""),
         })
 
-    _cache[key] = {"ts": now, "data": results}
     return results
 
 
 def search_news_multi(queries=None, freshness="pd", count=20):
+    """Fetch several queries concurrently and merge them, deduped by URL.
+
+    Articles keep the order of the queries they came from.
+    """
     if queries is None:
         queries = DEFAULT_QUERIES
 
+    if len(queries) == 1:
+        results = [fetch_news(queries[0], freshness=freshness, count=count)]
+    else:
+        futures = [_pool.submit(fetch_news, q, freshness=freshness, count=count) for q in queries]
+        results = [f.result() for f in futures]
+
     seen_urls = set()
     all_articles = []
 
-    for q in queries:
-        articles = fetch_news(q, freshness=freshness, count=count)
+    for articles in results:
         for art in articles:
             if art["url"] not in seen_urls:
                 seen_urls.add(art["url"])
@@ -0,0 +1,277 @@
+"""
+Shared in-process cache used by all services.
+Each namespace is a bounded LRU with its own TTL, entry limit and memory
+budget (see CACHE_CONFIG in config.py), and keeps hit/miss/eviction counters.
+Concurrent misses for the same key are coalesced into a single upstream load,
+and expired entries can be served stale while a background refresh runs.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import CACHE_CONFIG, CACHE_REFRESH_WORKERS
+
+_MISSING = object()
+
+_refresh_pool = ThreadPoolExecutor(max_workers=CACHE_REFRESH_WORKERS, thread_name_prefix="cache-refresh")
+
+
+def _approx_size(obj, _depth=0):
+    """Rough memory footprint of a JSON-like value in bytes."""
+    size = sys.getsizeof(obj)
+    if _depth > 20:
+        return size
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += _approx_size(k, _depth + 1) + _approx_size(v, _depth + 1)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for v in obj:
+            size += _approx_size(v, _depth + 1)
+    return size
+
+
+def mark_stale(value, age):
+    """Return a copy of a dict result tagged with its cache age in seconds."""
+    if isinstance(value, dict):
+        return {**value, "cache_age": round(age, 1)}
+    return value
+
+
+def no_error(value):
+    """Cache predicate: skip service results that carry an "error" key."""
+    return not (isinstance(value, dict) and "error" in value)
+
+
+class _Flight:
+    """An in-progress load that other callers can wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a per-entry TTL and size/memory bounds."""
+
+    def __init__(self, name, ttl, max_entries=1000, max_bytes=None, max_stale=0):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_stale = max_stale
+        self._data = OrderedDict()  # key -> (ts, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.refreshes = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing/expired."""
+        with self._lock:
+            entry, age = self._entry(key)
+            if entry is None or age >= self.ttl:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[2]
+
+    def get_with_age(self, key, default=None):
+        """Return (value, age_seconds), including stale entries still within
+        max_stale past their TTL. Returns (default, None) on a miss.
+        """
+        with self._lock:
+            entry, age = self._entry(key)
+            if entry is None:
+                self.misses += 1
+                return default, None
+            if age < self.ttl:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return entry[2], age
+
+    def _entry(self, key):
+        """Return (entry, age) for key, dropping entries past max_stale."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None, None
+        age = time.time() - entry[0]
+        if age >= self.ttl + self.max_stale:
+            self._remove(key)
+            self.expirations += 1
+            return None, None
+        self._data.move_to_end(key)
+        return entry, age
+
+    def get_or_load(self, key, loader, cacheable=None):
+        """Return the cached value for key, calling loader() once on a miss.
+
+        Concurrent callers that miss on the same key wait for the in-flight
+        load and share its result. Entries past their TTL but within
+        max_stale are returned immediately (dicts get a "cache_age" field)
+        while loader() refreshes them in the background. The result is only
+        stored when cacheable(result) is true (default: always).
+        """
+        value, age = self.get_with_age(key, _MISSING)
+
+        def load():
+            # Another leader may have refreshed the key since our lookup
+            with self._lock:
+                entry = self._data.get(key)
+                if entry is not None and time.time() - entry[0] < self.ttl:
+                    return entry[2]
+            result = loader()
+            if cacheable is None or cacheable(result):
+                self.set(key, result)
+            return result
+
+        if value is _MISSING:
+            return self.singleflight(key, load)
+        if age >= self.ttl:
+            self.refresh(key, load)
+            return mark_stale(value, age)
+        return value
+
+    def refresh(self, key, fn):
+        """Run fn() in the background under singleflight(key), unless a load
+        for key is already in progress.
+        """
+        with self._lock:
+            if key in self._inflight:
+                return
+            self.refreshes += 1
+        _refresh_pool.submit(self._run_refresh, key, fn)
+
+    def _run_refresh(self, key, fn):
+        try:
+            self.singleflight(key, fn)
+        except Exception as e:
+            print(f"[cache] Background refresh of {self.name}:{key} failed: {e}")
+
+    def singleflight(self, key, fn):
+        """Run fn() for key unless a call for the same key is already running,
+        in which case wait for it and return its result (or raise its error).
+        """
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fn()
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def set(self, key, value):
+        """Store value under key, evicting least recently used entries as needed."""
+        size = _approx_size(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (time.time(), size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (
+                self.max_bytes and self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and time.time() - entry[0] < self.ttl
+
+    def stats(self):
+        """Return counters and current usage for this namespace."""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "name": self.name,
+                "ttl": self.ttl,
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_stale": self.max_stale,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "coalesced": self.coalesced,
+                "refreshes": self.refreshes,
+                "in_flight": len(self._inflight),
+            }
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache(name):
+    """Return the shared cache for a namespace, creating it from CACHE_CONFIG."""
+    with _registry_lock:
+        cache = _registry.get(name)
+        if cache is None:
+            cfg = CACHE_CONFIG.get(name, {})
+            cache = TTLCache(
+                name,
+                ttl=cfg.get("ttl", 300),
+                max_entries=cfg.get("max_entries", 1000),
+                max_bytes=cfg.get("max_bytes"),
+                max_stale=cfg.get("max_stale", 0),
+            )
+            _registry[name] = cache
+        return cache
+
+
+def cache_stats():
+    """Return stats for every cache namespace in use."""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {"caches": {c.name: c.stats() for c in caches}}
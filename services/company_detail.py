@@ -2,11 +2,11 @@
 Company detail service — aggregates all data needed for the company detail page.
 Uses yfinance for price, fundamentals, and financial statements.
 """
-import time
 import yfinance as yf
-from config import DETAIL_CACHE_TTL
+from services.cache import get_cache, no_error
+from services.frames import frame_to_dict
 
-_cache = {}
+_cache = get_cache("detail")
 
 
 def _safe(val, default=None):
@@ -32,33 +32,16 @@ def _df_to_dict(df):
     """Convert a yfinance DataFrame (rows=items, cols=dates) to serializable dict."""
     if df is None or df.empty:
         return {}
-    result = {}
-    cols = [str(c)[:10] if hasattr(c, 'strftime') else str(c)[:10] for c in df.columns]
-    result["_periods"] = cols
-    for idx in df.index:
-        row_label = str(idx)
-        vals = []
-        for c in df.columns:
-            v = df.loc[idx, c]
-            try:
-                import math
-                if v is None or (isinstance(v, float) and math.isnan(v)):
-                    vals.append(None)
-                else:
-                    vals.append(float(v))
-            except (TypeError, ValueError):
-                vals.append(None)
-        result[row_label] = vals
-    return result
+    return frame_to_dict(df, "_periods", column_label=lambda c: str(c)[:10])
 
 
 def get_company_detail(ticker):
     """Return all data for the company detail page."""
     cache_key = f"detail_{ticker.upper()}"
-    now = time.time()
-    if cache_key in _cache and now - _cache[cache_key]["ts"] < DETAIL_CACHE_TTL:
-        return _cache[cache_key]["data"]
+    return _cache.get_or_load(cache_key, lambda: _fetch_company_detail(ticker), cacheable=no_error)
 
+
+def _fetch_company_detail(ticker):
     try:
         t = yf.Ticker(ticker.upper())
         info = t.info or {}
@@ -170,8 +153,6 @@ def get_company_detail(ticker):
             "statements": statements,
             "estimates": estimates,
         }
-
-        _cache[cache_key] = {"ts": now, "data": data}
         return data
 
     except Exception as e:
@@ -0,0 +1,192 @@
+"""
+Bulk fundamentals ingestion from SEC's companyfacts archive.
+companyfacts.zip (https://www.sec.gov/Archives/edgar/daily-index/xbrl/companyfacts.zip)
+holds one CIK##########.json per filer with every XBRL fact it has reported.
+Members are read one at a time; with ijson installed each us-gaap concept is
+streamed and dropped unless it feeds a metric, otherwise one company's JSON is
+loaded at a time. The us-gaap concepts behind _compute_metrics are mapped to
+annual (10-K) and quarterly (10-Q) periods and merged into the fundamentals
+store, so history requests find the data already there.
+
+Run: python -m services.companyfacts path/to/companyfacts.zip [--limit N]
+"""
+import argparse
+import json
+import re
+import zipfile
+from datetime import date
+from services.financials import derive_metrics, growth_pct
+from services.fundamentals import read_manifest, upsert_periods
+from services.issuers import ticker_for_cik
+
+# Metric -> us-gaap concepts in order of preference
+CONCEPTS = {
+    "revenue": [
+        "Revenues", "RevenueFromContractWithCustomerExcludingAssessedTax", "SalesRevenueNet",
+        "RevenueFromContractWithCustomerIncludingAssessedTax",
+    ],
+    "cost_of_revenue": ["CostOfRevenue", "CostOfGoodsAndServicesSold", "CostOfGoodsSold"],
+    "gross_profit": ["GrossProfit"],
+    "operating_income": ["OperatingIncomeLoss"],
+    "net_income": ["NetIncomeLoss", "ProfitLoss"],
+    "eps": ["EarningsPerShareBasic", "EarningsPerShareDiluted"],
+    "interest_expense": ["InterestExpense"],
+    "tax_expense": ["IncomeTaxExpenseBenefit"],
+    "total_assets": ["Assets"],
+    "total_liabilities": ["Liabilities"],
+    "total_equity": [
+        "StockholdersEquity", "StockholdersEquityIncludingPortionAttributableToNoncontrollingInterest",
+    ],
+    "current_assets": ["AssetsCurrent"],
+    "current_liabilities": ["LiabilitiesCurrent"],
+    "long_term_debt": ["LongTermDebtNoncurrent", "LongTermDebt"],
+    "cash": ["CashAndCashEquivalentsAtCarryingValue"],
+    "inventory": ["InventoryNet"],
+    "accounts_receivable": ["AccountsReceivableNetCurrent"],
+    "operating_cashflow": ["NetCashProvidedByUsedInOperatingActivities"],
+    "capex": ["PaymentsToAcquirePropertyPlantAndEquipment"],
+    "dividends_paid": ["PaymentsOfDividends", "PaymentsOfDividendsCommonStock"],
+}
+UNITS = {"eps": "USD/shares"}  # everything else is reported in USD
+
+# Forms and duration bounds (days) of the facts kept for each frequency
+PERIODS = {
+    "annual": (("10-K", "10-K/A"), 330, 400),
+    "quarterly": (("10-Q", "10-Q/A"), 80, 100),
+}
+
+_concept_metric = {c: metric for metric, concepts in CONCEPTS.items() for c in concepts}
+_member_re = re.compile(r"CIK(\d{10})\.json$")
+
+
+def _days(start, end):
+    return (date.fromisoformat(end) - date.fromisoformat(start)).days
+
+
+def _iter_concepts(f):
+    """Yield (concept, body) for the us-gaap facts of one companyfacts document."""
+    try:
+        import ijson
+    except ImportError:
+        yield from json.load(f).get("facts", {}).get("us-gaap", {}).items()
+        return
+    yield from ijson.kvitems(f, "facts.us-gaap", use_float=True)
+
+
+def _collect(concepts):
+    """Keep the facts that can fill a metric.
+    Returns {freq: {concept: {end: (filed, value, accession)}}} for duration
+    facts and the same shape under "instant" keys for balance sheet facts.
+    When a period is reported more than once the latest filing wins.
+    """
+    found = {freq: {"duration": {}, "instant": {}} for freq in PERIODS}
+    for concept, body in concepts:
+        metric = _concept_metric.get(concept)
+        if metric is None:
+            continue
+        for fact in body.get("units", {}).get(UNITS.get(metric, "USD"), []):
+            end, value = fact.get("end"), fact.get("val")
+            if not end or value is None:
+                continue
+            for freq, (forms, low, high) in PERIODS.items():
+                if fact.get("form") not in forms:
+                    continue
+                if fact.get("start"):
+                    if not low <= _days(fact["start"], end) <= high:
+                        continue
+                    kind = "duration"
+                else:
+                    kind = "instant"
+                periods = found[freq][kind].setdefault(concept, {})
+                filed = fact.get("filed") or ""
+                if end not in periods or filed > periods[end][0]:
+                    periods[end] = (filed, float(value), fact.get("accn"))
+    return found
+
+
+def _rows(found):
+    """Turn collected facts into (period_end, metrics) rows and their accessions.
+    Periods are the ends of duration facts; instant facts only attach to them.
+    """
+    ends = set()
+    for periods in found["duration"].values():
+        ends.update(periods)
+
+    rows = []
+    accessions = set()
+    for end in sorted(ends):
+        m = {}
+        for metric, concepts in CONCEPTS.items():
+            for concept in concepts:
+                fact = found["duration"].get(concept, {}).get(end) or found["instant"].get(concept, {}).get(end)
+                if fact is not None:
+                    m[metric] = fact[1]
+                    accessions.add(fact[2])
+                    break
+        rows.append((end, derive_metrics(m)))
+    return rows, accessions
+
+
+def _add_growth(rows):
+    """Year-over-year growth for annual rows whose previous row is a year earlier."""
+    for (prev_end, prev), (end, m) in zip(rows, rows[1:]):
+        if 330 <= _days(prev_end, end) <= 400:
+            m["revenue_growth"] = growth_pct(m["revenue"], prev["revenue"])
+            m["earnings_growth"] = growth_pct(m["net_income"], prev["net_income"])
+
+
+def ingest_company(ticker, f):
+    """Read one companyfacts document and merge it into the ticker's store.
+    Returns the number of periods written; frequencies with no new filings are skipped.
+    """
+    found = _collect(_iter_concepts(f))
+    manifest = read_manifest(ticker)
+    written = 0
+    for freq in PERIODS:
+        rows, accessions = _rows(found[freq])
+        accessions.discard(None)
+        if not rows or accessions <= set(manifest[freq]["accessions"]):
+            continue
+        if freq == "annual":
+            _add_growth(rows)
+        upsert_periods(ticker, freq, rows, accessions)
+        written += len(rows)
+    return written
+
+
+def ingest_companyfacts(path, limit=None):
+    """Ingest every listed filer in a companyfacts zip into the fundamentals store.
+    Filers without a ticker in the issuer file are skipped.
+    """
+    stats = {"companies": 0, "unlisted": 0, "failed": 0, "periods": 0}
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            m = _member_re.search(info.filename)
+            if not m:
+                continue
+            ticker = ticker_for_cik(int(m.group(1)))
+            if ticker is None:
+                stats["unlisted"] += 1
+                continue
+            try:
+                with archive.open(info) as f:
+                    stats["periods"] += ingest_company(ticker, f)
+                stats["companies"] += 1
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"[companyfacts] Failed to ingest {ticker} ({info.filename}): {e}")
+                continue
+            if stats["companies"] % 500 == 0:
+                print(f"[companyfacts] {stats['companies']} companies, {stats['periods']} periods")
+            if limit and stats["companies"] >= limit:
+                break
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load SEC companyfacts into the fundamentals store.")
+    parser.add_argument("path", help="companyfacts.zip")
+    parser.add_argument("--limit", type=int, help="stop after this many companies")
+    args = parser.parse_args()
+
+    print(ingest_companyfacts(args.path, limit=args.limit))
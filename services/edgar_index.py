@@ -0,0 +1,166 @@
+"""
+Bulk Form 4 ingestion from EDGAR form index files.
+Daily (edgar/daily-index) or quarterly (edgar/full-index) form indexes list
+every filing of a period, so one pass over them discovers the whole market's
+Form 4 filings without per-company lookups. Discovered filings are fetched and
+parsed on a worker pool and stored in InsiderTrade in batches.
+
+Run: python -m services.edgar_index 2024-01-02 2024-01-31 [--quarterly]
+"""
+import argparse
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import requests
+from config import (
+    EDGAR_ARCHIVES_URL, EDGAR_INDEX_DIR, EDGAR_IDENTITY, INSIDER_FILING_WORKERS, INSIDER_INGEST_CHUNK,
+)
+from services.insider_store import known_accessions, store_trades
+from services.insiders import parse_form4_filing
+from services.rate_limit import sec_limiter
+
+FORM4_TYPES = ("4", "4/A")
+
+_session = requests.Session()
+_date_re = re.compile(r"^(\d{4})-?(\d{2})-?(\d{2})$")
+
+
+def _quarter(d):
+    return (d.month - 1) // 3 + 1
+
+
+def index_paths(start, end, quarterly=False):
+    """Archive-relative paths of the form index files covering start..end."""
+    paths = []
+    if quarterly:
+        year, qtr = start.year, _quarter(start)
+        while (year, qtr) <= (end.year, _quarter(end)):
+            paths.append(f"edgar/full-index/{year}/QTR{qtr}/form.idx")
+            year, qtr = (year + 1, 1) if qtr == 4 else (year, qtr + 1)
+    else:
+        d = start
+        while d <= end:
+            if d.weekday() < 5:
+                paths.append(f"edgar/daily-index/{d.year}/QTR{_quarter(d)}/form.{d:%Y%m%d}.idx")
+            d += timedelta(days=1)
+    return paths
+
+
+def _read_index(path):
+    """Return the text of an index file, or None if it does not exist
+    (daily indexes are missing on market holidays).
+    """
+    if EDGAR_INDEX_DIR:
+        local = os.path.join(EDGAR_INDEX_DIR, *path.split("/"))
+        if not os.path.exists(local):
+            return None
+        with open(local, encoding="latin-1") as f:
+            return f.read()
+
+    if not EDGAR_IDENTITY:
+        raise RuntimeError("EDGAR_IDENTITY is not set; SEC rejects requests without a User-Agent")
+    sec_limiter.acquire()
+    resp = _session.get(f"{EDGAR_ARCHIVES_URL}/{path}", headers={"User-Agent": EDGAR_IDENTITY}, timeout=30)
+    if resp.status_code == 404:
+        return None
+    if resp.status_code == 403:
+        # SEC answers 403 to every request it refuses (missing or blocked User-Agent)
+        raise RuntimeError(f"SEC refused {path} (403); check EDGAR_IDENTITY")
+    resp.raise_for_status()
+    return resp.content.decode("latin-1")
+
+
+def parse_form_index(text, forms=FORM4_TYPES):
+    """Yield entries of the given form types from a form.idx file.
+    Rows are fixed-width: form type, company name, CIK, date filed, file name.
+    """
+    body = text.split("\n-----", 1)
+    lines = body[1].splitlines()[1:] if len(body) == 2 else text.splitlines()
+    for line in lines:
+        parts = line.rsplit(None, 3)
+        if len(parts) != 4:
+            continue
+        head, cik, filed, filename = parts
+        form, _, company = head.strip().partition("  ")
+        if form not in forms:
+            continue
+        m = _date_re.match(filed)
+        if not m or not cik.isdigit():
+            continue
+        yield {
+            "form": form,
+            "company": company.strip(),
+            "cik": int(cik),
+            "filing_date": "-".join(m.groups()),
+            "accession_no": os.path.splitext(filename.rsplit("/", 1)[-1])[0],
+        }
+
+
+def discover_form4(start, end, quarterly=False):
+    """Return Form 4 index entries filed between start and end, one per accession.
+    (A Form 4 is listed under both the issuer and each reporting owner.)
+    """
+    entries = {}
+    for path in index_paths(start, end, quarterly):
+        text = _read_index(path)
+        if text is None:
+            continue
+        for entry in parse_form_index(text):
+            if start.isoformat() <= entry["filing_date"] <= end.isoformat():
+                entries.setdefault(entry["accession_no"], entry)
+    return list(entries.values())
+
+
+def _parse_entry(entry):
+    from edgar import Filing
+    filing = Filing(
+        cik=entry["cik"], company=entry["company"], form=entry["form"],
+        filing_date=entry["filing_date"], accession_no=entry["accession_no"],
+    )
+    return parse_form4_filing(filing, filing_date=datetime.strptime(entry["filing_date"], "%Y-%m-%d"))
+
+
+def ingest_form4(start, end, quarterly=False, workers=INSIDER_FILING_WORKERS):
+    """Discover, parse and store every Form 4 filed between start and end.
+    Filings whose trades are already stored are skipped.
+    """
+    entries = discover_form4(start, end, quarterly)
+    known = known_accessions(e["accession_no"] for e in entries)
+    todo = [e for e in entries if e["accession_no"] not in known]
+    stats = {"discovered": len(entries), "skipped": len(entries) - len(todo), "parsed": 0, "failed": 0, "trades": 0}
+    print(f"[edgar_index] {len(entries)} Form 4 filings in {start}..{end}, {len(todo)} to fetch")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="form4-ingest") as pool:
+        for i in range(0, len(todo), INSIDER_INGEST_CHUNK):
+            chunk = todo[i:i + INSIDER_INGEST_CHUNK]
+            trades = []
+            for entry, future in [(e, pool.submit(_parse_entry, e)) for e in chunk]:
+                try:
+                    trades.extend(future.result())
+                    stats["parsed"] += 1
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"[edgar_index] Failed to parse {entry['accession_no']}: {e}")
+            store_trades(trades)
+            stats["trades"] += len(trades)
+            print(f"[edgar_index] {min(i + len(chunk), len(todo))}/{len(todo)} filings, {stats['trades']} trades")
+
+    return stats
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+if __name__ == "__main__":
+    from database.connection import init_db
+
+    parser = argparse.ArgumentParser(description="Ingest Form 4 filings from EDGAR form indexes.")
+    parser.add_argument("start", type=_parse_date)
+    parser.add_argument("end", type=_parse_date, nargs="?", default=date.today())
+    parser.add_argument("--quarterly", action="store_true", help="read quarterly full-index files")
+    args = parser.parse_args()
+
+    init_db()
+    print(ingest_form4(args.start, args.end, quarterly=args.quarterly))
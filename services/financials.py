@@ -1,12 +1,55 @@
 """
 SEC EDGAR financial statements via edgartools.
 Computes key metrics from 10-K filings.
+Parsed results are stored in CachedFinancial keyed by ticker and 10-K
+accession number, so each filing's XBRL is parsed once and survives restarts.
+Comparisons resolve filings on a thread pool and parse XBRL in a process pool;
+filings are downloaded in this process behind sec_limiter and workers only parse.
+Each parsed filing's metrics also feed the multi-year fundamentals store.
 """
-import time
 import json
-from config import FINANCIAL_CACHE_TTL
-
-_cache = {}
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from sqlalchemy.dialects.sqlite import insert
+from config import (
+    FINANCIAL_FILING_CHECK_INTERVAL, FINANCIAL_COMPARE_WORKERS, FINANCIAL_PARSE_WORKERS,
+    FINANCIAL_COMPARE_DEADLINE, FUNDAMENTALS_MAX_FILINGS,
+)
+from database.connection import get_session
+from database.models import CachedFinancial
+from services.cache import get_cache, no_error
+from services.frames import frame_to_dict
+from services.fundamentals import read_manifest, upsert_periods, get_history, valid_ticker
+from services.rate_limit import sec_limiter
+
+_cache = get_cache("financials")
+
+HISTORY_FORMS = {"annual": "10-K", "quarterly": "10-Q"}
+# 10-Q cash flow statements are year-to-date, and their second column is not
+# the prior year, so these are left out of quarterly history
+QUARTERLY_EXCLUDED = (
+    "operating_cashflow", "capex", "dividends_paid", "free_cash_flow", "revenue_growth", "earnings_growth",
+)
+
+_compare_pool = ThreadPoolExecutor(max_workers=FINANCIAL_COMPARE_WORKERS, thread_name_prefix="financials")
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def _get_parse_pool():
+    """Process pool for CPU-bound XBRL parsing, started on first use."""
+    global _parse_pool
+    if _parse_pool is None:
+        with _parse_pool_lock:
+            if _parse_pool is None:
+                # spawn: forking a process that runs request threads is unsafe
+                _parse_pool = ProcessPoolExecutor(
+                    max_workers=FINANCIAL_PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _parse_pool
 
 
 def _safe_div(a, b):
@@ -20,117 +63,324 @@ def _safe_pct(a, b):
     return round(v * 100, 2) if v is not None else None
 
 
-def _safe_growth(new, old):
+def growth_pct(new, old):
+    """Percent change from old to new, or None if either is missing or old is 0."""
     if new is None or old is None or old == 0:
         return None
     return round(((new - old) / abs(old)) * 100, 2)
 
 
-def _get_val(df, label, year_idx=0):
-    """Extract a value from a pandas DataFrame by label and column index."""
-    try:
-        if df is None or df.empty:
-            return None
-        for idx in df.index:
-            if label.lower() in str(idx).lower():
-                vals = df.loc[idx]
-                if year_idx < len(vals):
-                    v = vals.iloc[year_idx]
-                    if hasattr(v, 'item'):
-                        return v.item()
-                    return float(v) if v is not None else None
+def _scalar(v):
+    if v is None:
         return None
-    except Exception:
+    if hasattr(v, 'item'):
+        return v.item()
+    try:
+        return float(v)
+    except (ValueError, TypeError):
         return None
 
 
-def _search_val(df, keywords, year_idx=0):
-    """Search for a value using multiple keyword alternatives."""
-    for kw in keywords:
-        val = _get_val(df, kw, year_idx)
-        if val is not None:
-            return val
-    return None
+class _LabelIndex:
+    """A statement normalized once for metric lookups: lowercased row labels,
+    row values as plain lists, and a memo of keyword -> first matching row.
+    """
+
+    def __init__(self, df):
+        self.labels = []
+        self.rows = []
+        self.width = 0
+        self._resolved = {}
+        try:
+            if df is not None and not df.empty:
+                self.labels = [str(idx).lower() for idx in df.index]
+                self.rows = df.to_numpy().tolist()
+                self.width = len(df.columns)
+        except Exception:
+            self.labels, self.rows, self.width = [], [], 0
+
+    def row_for(self, keyword):
+        """Index of the first row whose label contains keyword, or None."""
+        try:
+            return self._resolved[keyword]
+        except KeyError:
+            pass
+        kw = keyword.lower()
+        row = next((i for i, label in enumerate(self.labels) if kw in label), None)
+        self._resolved[keyword] = row
+        return row
+
+    def value(self, keywords, year_idx=0):
+        """Value of the first keyword alternative with a matching row."""
+        if year_idx >= self.width:
+            return None
+        for kw in keywords:
+            row = self.row_for(kw)
+            if row is not None:
+                val = _scalar(self.rows[row][year_idx])
+                if val is not None:
+                    return val
+        return None
 
 
 def lookup_financials(ticker):
     """Fetch financial data for a ticker from SEC EDGAR."""
     cache_key = f"fin_{ticker}"
-    now = time.time()
-    if cache_key in _cache and now - _cache[cache_key]["ts"] < FINANCIAL_CACHE_TTL:
-        return _cache[cache_key]["data"]
+    return _cache.get_or_load(cache_key, lambda: _fetch_financials(ticker), cacheable=no_error)
+
+
+def _load_stored(ticker):
+    """Return the stored CachedFinancial row for the ticker's newest 10-K, or None."""
+    session = get_session()
+    try:
+        row = (
+            session.query(CachedFinancial)
+            .filter(CachedFinancial.ticker == ticker, CachedFinancial.accession_no != None)
+            .order_by(CachedFinancial.filing_date.desc(), CachedFinancial.id.desc())
+            .first()
+        )
+        if row is not None:
+            session.expunge(row)
+        return row
+    finally:
+        session.close()
+
+
+def _mark_checked(row_id, now):
+    session = get_session()
+    try:
+        session.query(CachedFinancial).filter(CachedFinancial.id == row_id).update(
+            {CachedFinancial.checked_at: now}, synchronize_session=False,
+        )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def _store(ticker, accession, filing_date, result, now):
+    session = get_session()
+    try:
+        stmt = insert(CachedFinancial).values(
+            ticker=ticker, accession_no=accession, filing_date=filing_date,
+            data_json=json.dumps(result), checked_at=now, fetched_at=now,
+        )
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=["ticker", "accession_no"],
+            set_={"data_json": stmt.excluded.data_json, "checked_at": now, "fetched_at": now},
+        ))
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def _period_end(filing):
+    """Fiscal period end of a filing, falling back to its filing date.
+    Uses the report_date that Company.get_filings already carries;
+    period_of_report would download the whole submission again.
+    """
+    period = getattr(filing, "report_date", None)
+    if isinstance(period, str):
+        period = period.strip()
+    return period or _filing_datetime(filing)
+
+
+def _filing_datetime(filing):
+    value = getattr(filing, "filing_date", None)
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], "%Y-%m-%d")
+    return datetime(value.year, value.month, value.day)
+
+
+def _parse_xbrl(xbrl):
+    """Parse a filing's XBRL into metrics and display statements."""
+    if xbrl is None:
+        return None
+
+    # Try to get financial statements
+    income = None
+    balance = None
+    cashflow = None
+
+    try:
+        income = xbrl.statements.income
+    except Exception:
+        pass
+    try:
+        balance = xbrl.statements.balance_sheet
+    except Exception:
+        pass
+    try:
+        cashflow = xbrl.statements.cash_flow
+    except Exception:
+        pass
+
+    # Extract metrics
+    metrics = _compute_metrics(income, balance, cashflow)
+
+    # Build statement data for display
+    statements = {
+        "income": _statement_to_dict(income),
+        "balance": _statement_to_dict(balance),
+        "cashflow": _statement_to_dict(cashflow),
+    }
+    return {"metrics": metrics, "statements": statements}
+
+
+def _parse_statements(filing):
+    """Download a filing's XBRL and parse it in this process."""
+    sec_limiter.acquire()
+    return _parse_xbrl(filing.xbrl())
+
+
+def _parse_submission(text):
+    """Process-pool entry point: parse a full text submission without
+    touching the network, so workers never bypass sec_limiter.
+    """
+    from edgar import Filing
+    return _parse_xbrl(Filing.from_sgml_text(text).xbrl())
+
+
+def _parse_in_process(filing):
+    """Download the filing here behind sec_limiter, parse it in the process pool."""
+    global _parse_pool
+    sec_limiter.acquire()
+    text = filing.full_text_submission()
+    pool = _get_parse_pool()
+    try:
+        return pool.submit(_parse_submission, text).result()
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool next time and parse this one here
+        with _parse_pool_lock:
+            if _parse_pool is pool:
+                _parse_pool = None
+        return _parse_submission(text)
+
+
+def _fetch_financials(ticker, parse=_parse_statements):
+    now = datetime.utcnow()
+    stored = _load_stored(ticker)
+    if stored is not None and stored.checked_at and \
+            now - stored.checked_at < timedelta(seconds=FINANCIAL_FILING_CHECK_INTERVAL):
+        return json.loads(stored.data_json)
 
     try:
         from edgar import Company
+        sec_limiter.acquire()
         company = Company(ticker)
+        sec_limiter.acquire()
         filings = company.get_filings(form="10-K")
 
         if not filings or len(filings) == 0:
             return {"error": f"No 10-K filings found for {ticker}"}
 
-        # Get the most recent 10-K
+        # Get the most recent 10-K; reuse the stored parse if we already have it
         latest = filings[0]
-        xbrl = latest.xbrl()
+        accession = getattr(latest, "accession_no", None)
+        if stored is not None and accession and stored.accession_no == accession:
+            _mark_checked(stored.id, now)
+            return json.loads(stored.data_json)
 
-        if xbrl is None:
+        parsed = parse(latest)
+        if parsed is None:
             return {"error": f"Could not parse XBRL for {ticker}"}
 
-        # Try to get financial statements
-        income = None
-        balance = None
-        cashflow = None
-
-        try:
-            income = xbrl.statements.income
-        except Exception:
-            pass
-        try:
-            balance = xbrl.statements.balance_sheet
-        except Exception:
-            pass
-        try:
-            cashflow = xbrl.statements.cash_flow
-        except Exception:
-            pass
-
-        # Extract metrics
-        metrics = _compute_metrics(income, balance, cashflow)
-
-        # Build statement data for display
-        statements = {
-            "income": _statement_to_dict(income),
-            "balance": _statement_to_dict(balance),
-            "cashflow": _statement_to_dict(cashflow),
-        }
-
+        filing_date = _filing_datetime(latest)
         result = {
             "ticker": ticker,
             "company": str(company),
-            "metrics": metrics,
-            "statements": statements,
+            "accession_no": accession,
+            "filing_date": filing_date.strftime("%Y-%m-%d") if filing_date else None,
+            "metrics": parsed["metrics"],
+            "statements": parsed["statements"],
         }
-
-        _cache[cache_key] = {"ts": now, "data": result}
+        if accession:
+            try:
+                _store(ticker, accession, filing_date, result, now)
+                upsert_periods(ticker, "annual", [(_period_end(latest), parsed["metrics"])], [accession])
+            except Exception as e:
+                print(f"[financials] Failed to store {ticker} {accession}: {e}")
         return result
 
     except Exception as e:
+        if stored is not None:
+            # EDGAR is unreachable; the last parsed 10-K is still the latest we know of
+            print(f"[financials] Serving stored {ticker} {stored.accession_no}: {e}")
+            result = json.loads(stored.data_json)
+            result["stale"] = True
+            return result
         return {"error": f"Failed to fetch financials for {ticker}: {str(e)}"}
 
 
+# Values read directly from statements; everything else is derived from them
+BASE_METRICS = (
+    "revenue", "cost_of_revenue", "gross_profit", "operating_income", "net_income", "ebitda", "eps",
+    "interest_expense", "tax_expense", "total_assets", "total_liabilities", "total_equity",
+    "current_assets", "current_liabilities", "long_term_debt", "total_debt", "cash", "inventory",
+    "accounts_receivable", "operating_cashflow", "capex", "dividends_paid",
+)
+
+
 def _compute_metrics(income, balance, cashflow):
     """Compute 30+ financial metrics from statements."""
+    income, balance, cashflow = _LabelIndex(income), _LabelIndex(balance), _LabelIndex(cashflow)
     m = {}
 
     # Income statement metrics
-    m["revenue"] = _search_val(income, ["revenue", "net revenue", "total revenue", "sales"])
-    m["cost_of_revenue"] = _search_val(income, ["cost of revenue", "cost of goods", "cost of sales"])
-    m["gross_profit"] = _search_val(income, ["gross profit"])
-    m["operating_income"] = _search_val(income, ["operating income", "income from operations"])
-    m["net_income"] = _search_val(income, ["net income", "net earnings"])
-    m["ebitda"] = _search_val(income, ["ebitda"])
-    m["eps"] = _search_val(income, ["earnings per share", "basic eps", "diluted eps"])
-    m["interest_expense"] = _search_val(income, ["interest expense"])
-    m["tax_expense"] = _search_val(income, ["income tax", "tax expense", "provision for income tax"])
+    m["revenue"] = income.value(["revenue", "net revenue", "total revenue", "sales"])
+    m["cost_of_revenue"] = income.value(["cost of revenue", "cost of goods", "cost of sales"])
+    m["gross_profit"] = income.value(["gross profit"])
+    m["operating_income"] = income.value(["operating income", "income from operations"])
+    m["net_income"] = income.value(["net income", "net earnings"])
+    m["ebitda"] = income.value(["ebitda"])
+    m["eps"] = income.value(["earnings per share", "basic eps", "diluted eps"])
+    m["interest_expense"] = income.value(["interest expense"])
+    m["tax_expense"] = income.value(["income tax", "tax expense", "provision for income tax"])
+
+    # Balance sheet metrics
+    m["total_assets"] = balance.value(["total assets"])
+    m["total_liabilities"] = balance.value(["total liabilities"])
+    m["total_equity"] = balance.value(["total equity", "stockholders equity", "shareholders equity", "total stockholders"])
+    m["current_assets"] = balance.value(["total current assets", "current assets"])
+    m["current_liabilities"] = balance.value(["total current liabilities", "current liabilities"])
+    m["long_term_debt"] = balance.value(["long-term debt", "long term debt"])
+    m["total_debt"] = balance.value(["total debt"])
+    m["cash"] = balance.value(["cash and cash equivalents", "cash and equivalents"])
+    m["inventory"] = balance.value(["inventory", "inventories"])
+    m["accounts_receivable"] = balance.value(["accounts receivable", "receivables"])
+
+    # Cash flow metrics
+    m["operating_cashflow"] = cashflow.value(["operating", "cash from operations", "net cash provided by operating"])
+    m["capex"] = cashflow.value(["capital expenditure", "purchase of property", "payments for property"])
+    m["dividends_paid"] = cashflow.value(["dividends paid", "payment of dividends"])
+
+    derive_metrics(m)
+
+    # Growth - compare year 0 vs year 1
+    rev_prev = income.value(["revenue", "net revenue", "total revenue", "sales"], 1)
+    ni_prev = income.value(["net income", "net earnings"], 1)
+    m["revenue_growth"] = growth_pct(m["revenue"], rev_prev)
+    m["earnings_growth"] = growth_pct(m["net_income"], ni_prev)
+
+    # P/E ratio (needs price data — skip for now, set None)
+    m["pe_ratio"] = None
+
+    return m
+
+
+def derive_metrics(m):
+    """Fill margins, ratios and free cash flow from the BASE_METRICS in m.
+    Missing base values are set to None. Modifies and returns m.
+    """
+    for key in BASE_METRICS:
+        m.setdefault(key, None)
 
     # Compute gross profit if missing
     if m["gross_profit"] is None and m["revenue"] and m["cost_of_revenue"]:
@@ -141,18 +391,6 @@ def _compute_metrics(income, balance, cashflow):
     m["operating_margin"] = _safe_pct(m["operating_income"], m["revenue"])
     m["net_margin"] = _safe_pct(m["net_income"], m["revenue"])
 
-    # Balance sheet metrics
-    m["total_assets"] = _search_val(balance, ["total assets"])
-    m["total_liabilities"] = _search_val(balance, ["total liabilities"])
-    m["total_equity"] = _search_val(balance, ["total equity", "stockholders equity", "shareholders equity", "total stockholders"])
-    m["current_assets"] = _search_val(balance, ["total current assets", "current assets"])
-    m["current_liabilities"] = _search_val(balance, ["total current liabilities", "current liabilities"])
-    m["long_term_debt"] = _search_val(balance, ["long-term debt", "long term debt"])
-    m["total_debt"] = _search_val(balance, ["total debt"])
-    m["cash"] = _search_val(balance, ["cash and cash equivalents", "cash and equivalents"])
-    m["inventory"] = _search_val(balance, ["inventory", "inventories"])
-    m["accounts_receivable"] = _search_val(balance, ["accounts receivable", "receivables"])
-
     # Ratios
     m["current_ratio"] = _safe_div(m["current_assets"], m["current_liabilities"])
     if m["current_ratio"]:
@@ -176,24 +414,10 @@ def _compute_metrics(income, balance, cashflow):
     else:
         m["interest_coverage"] = None
 
-    # Cash flow metrics
-    m["operating_cashflow"] = _search_val(cashflow, ["operating", "cash from operations", "net cash provided by operating"])
-    m["capex"] = _search_val(cashflow, ["capital expenditure", "purchase of property", "payments for property"])
     m["free_cash_flow"] = None
     if m["operating_cashflow"] is not None and m["capex"] is not None:
         m["free_cash_flow"] = m["operating_cashflow"] - abs(m["capex"])
 
-    m["dividends_paid"] = _search_val(cashflow, ["dividends paid", "payment of dividends"])
-
-    # Growth - compare year 0 vs year 1
-    rev_prev = _search_val(income, ["revenue", "net revenue", "total revenue", "sales"], 1)
-    ni_prev = _search_val(income, ["net income", "net earnings"], 1)
-    m["revenue_growth"] = _safe_growth(m["revenue"], rev_prev)
-    m["earnings_growth"] = _safe_growth(m["net_income"], ni_prev)
-
-    # P/E ratio (needs price data — skip for now, set None)
-    m["pe_ratio"] = None
-
     return m
 
 
@@ -203,42 +427,108 @@ def _statement_to_dict(df):
         return {}
 
     try:
-        result = {}
-        # Get year columns
-        years = []
-        for col in df.columns:
-            years.append(str(col))
-        result["_years"] = years
-
-        for idx in df.index:
-            label = str(idx)
-            vals = []
-            for col in df.columns:
-                v = df.loc[idx, col]
-                if hasattr(v, 'item'):
-                    vals.append(v.item())
-                elif v is None:
-                    vals.append(None)
-                else:
-                    try:
-                        vals.append(float(v))
-                    except (ValueError, TypeError):
-                        vals.append(None)
-            result[label] = vals
-
-        return result
+        return frame_to_dict(df, "_years")
     except Exception:
         return {}
 
 
-def compare_financials(tickers):
-    """Fetch and compare financials for multiple tickers."""
-    companies = []
-    for t in tickers:
-        data = lookup_financials(t.strip().upper())
-        if "error" not in data:
-            companies.append({
-                "ticker": data["ticker"],
-                "metrics": data.get("metrics", {}),
-            })
-    return {"companies": companies}
+def sync_history(ticker, freq="annual"):
+    """Add filings not yet in the fundamentals store, newest
+    FUNDAMENTALS_MAX_FILINGS per frequency. Checks EDGAR at most once per
+    FINANCIAL_FILING_CHECK_INTERVAL.
+    """
+    now = datetime.utcnow()
+    section = read_manifest(ticker)[freq]
+    if section["checked_at"]:
+        age = now - datetime.fromisoformat(section["checked_at"])
+        if age < timedelta(seconds=FINANCIAL_FILING_CHECK_INTERVAL):
+            return section
+
+    from edgar import Company
+    sec_limiter.acquire()
+    company = Company(ticker)
+    sec_limiter.acquire()
+    filings = company.get_filings(form=HISTORY_FORMS[freq])
+
+    known = set(section["accessions"])
+    todo = [f for f in (filings[:FUNDAMENTALS_MAX_FILINGS[freq]] if filings else [])
+            if f.accession_no not in known]
+    futures = [(f, _compare_pool.submit(_parse_in_process, f)) for f in todo]
+
+    rows = []
+    accessions = []
+    for filing, future in futures:
+        try:
+            parsed = future.result()
+        except Exception as e:
+            print(f"[financials] Failed to parse {ticker} {filing.accession_no}: {e}")
+            continue
+        accessions.append(filing.accession_no)
+        if parsed is not None:
+            metrics = parsed["metrics"]
+            if freq == "quarterly":
+                metrics = {k: v for k, v in metrics.items() if k not in QUARTERLY_EXCLUDED}
+            rows.append((_period_end(filing), metrics))
+
+    return upsert_periods(ticker, freq, rows, accessions, checked_at=now)
+
+
+def financial_history(ticker, freq="annual", metrics=None, years=None):
+    """Metric time series and CAGR for a ticker, syncing new filings first."""
+    if freq not in HISTORY_FORMS:
+        return {"error": f"Unknown frequency: {freq} (use {', '.join(HISTORY_FORMS)})"}
+    if not valid_ticker(ticker):
+        return {"error": f"Invalid ticker: {ticker}"}
+    try:
+        _cache.singleflight(("history", ticker, freq), lambda: sync_history(ticker, freq))
+    except Exception as e:
+        result = get_history(ticker, freq, metrics, years)
+        if not result["periods"]:
+            return {"error": f"Failed to fetch financial history for {ticker}: {str(e)}"}
+        result["stale"] = True
+        return result
+    return get_history(ticker, freq, metrics, years)
+
+
+def _compare_one(ticker):
+    # Same cache key as lookup_financials, but XBRL parsing runs in the process pool
+    cache_key = f"fin_{ticker}"
+    return _cache.get_or_load(
+        cache_key, lambda: _fetch_financials(ticker, parse=_parse_in_process), cacheable=no_error,
+    )
+
+
+def compare_financials(tickers, deadline=FINANCIAL_COMPARE_DEADLINE):
+    """Fetch and compare financials for multiple tickers.
+    Filings are resolved concurrently and parsed in a process pool. Tickers
+    that fail are listed in "errors"; if the deadline passes, the companies
+    finished so far are returned with "partial": True and the rest in
+    "pending" (their lookups keep running and fill the cache).
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers))
+    futures = {_compare_pool.submit(_compare_one, t): t for t in tickers}
+    done, not_done = wait(futures, timeout=deadline)
+
+    results = {}
+    errors = []
+    for future in done:
+        ticker = futures[future]
+        try:
+            data = future.result()
+        except Exception as e:
+            data = {"error": f"Failed to fetch financials for {ticker}: {str(e)}"}
+        if "error" in data:
+            errors.append({"ticker": ticker, "error": data["error"]})
+        else:
+            results[ticker] = data
+
+    companies = [
+        {"ticker": results[t]["ticker"], "metrics": results[t].get("metrics", {})}
+        for t in tickers if t in results
+    ]
+    result = {"companies": companies, "errors": errors}
+    if not_done:
+        result["partial"] = True
+        pending = {futures[f] for f in not_done}
+        result["pending"] = [t for t in tickers if t in pending]
+    return result
@@ -0,0 +1,160 @@
+"""
+Streaming Form 4 XML parser.
+Walks the ownershipDocument with iterparse, keeping only the fields the
+insider views use (issuer, first reporting owner, non-derivative transactions)
+and clearing each element once read, instead of building edgartools' full
+ownership object model.
+"""
+import io
+import re
+from xml.etree.ElementTree import iterparse
+from services.issuers import ticker_for_cik
+
+TRADE_TYPES = {"P": "Purchase", "S": "Sale"}
+
+# issuerTradingSymbol is free text: "NONE", "N/A", "GOOG, GOOGL", "brk.b"...
+_symbol_split_re = re.compile(r"[,;/\s]+")
+_symbol_re = re.compile(r"^[A-Z0-9][A-Z0-9\-]{0,9}$")
+_NO_SYMBOL = {"NONE", "NA", "N/A", "NULL"}
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _text(elem, path):
+    """Text of a child at path, looking through <value> wrappers."""
+    node = elem.find(path)
+    if node is None:
+        return ""
+    value = node.find("value")
+    if value is not None:
+        node = value
+    return (node.text or "").strip()
+
+
+def _number(text, cast):
+    try:
+        return cast(float(text)) if text else 0
+    except ValueError:
+        return 0
+
+
+def _owner_title(rel):
+    title = _text(rel, "officerTitle")
+    if title:
+        return title
+    if _text(rel, "isDirector") in ("1", "true"):
+        return "Director"
+    if _text(rel, "isTenPercentOwner") in ("1", "true"):
+        return "10% Owner"
+    return _text(rel, "otherText")
+
+
+def parse_form4_xml(source):
+    """Parse a Form 4 document (bytes, str, path or file object).
+
+    Returns {"ticker", "issuer_name", "issuer_cik", "owner_name", "owner_title",
+    "transactions": [{"date", "code", "trade_type", "shares", "price",
+    "acquired_disposed"}]} for the non-derivative transactions.
+    """
+    if isinstance(source, str) and source.lstrip().startswith("<"):
+        source = source.encode("utf-8")
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    doc = {
+        "ticker": "", "issuer_name": "", "issuer_cik": "",
+        "owner_name": "", "owner_title": "", "transactions": [],
+    }
+    owner_seen = False
+
+    for _, elem in iterparse(source, events=("end",)):
+        tag = _local(elem.tag)
+        if elem.tag != tag:
+            elem.tag = tag  # namespaced documents: let find() use bare names
+        if tag == "issuer":
+            doc["ticker"] = _text(elem, "issuerTradingSymbol").upper()
+            doc["issuer_name"] = _text(elem, "issuerName")
+            doc["issuer_cik"] = _text(elem, "issuerCik")
+            elem.clear()
+        elif tag == "reportingOwner":
+            # Joint filings list several owners; the first is the filer
+            if not owner_seen:
+                owner_seen = True
+                doc["owner_name"] = _text(elem, "reportingOwnerId/rptOwnerName")
+                rel = elem.find("reportingOwnerRelationship")
+                if rel is not None:
+                    doc["owner_title"] = _owner_title(rel)
+            elem.clear()
+        elif tag == "nonDerivativeTransaction":
+            code = _text(elem, "transactionCoding/transactionCode").upper()
+            doc["transactions"].append({
+                "date": _text(elem, "transactionDate"),
+                "code": code,
+                "trade_type": TRADE_TYPES.get(code, code or "Unknown"),
+                "shares": _number(_text(elem, "transactionAmounts/transactionShares"), int),
+                "price": _number(_text(elem, "transactionAmounts/transactionPricePerShare"), float),
+                "acquired_disposed": _text(elem, "transactionAmounts/transactionAcquiredDisposedCode").upper(),
+            })
+            elem.clear()
+        elif tag in ("derivativeTable", "nonDerivativeHolding", "footnotes", "ownerSignature"):
+            elem.clear()
+
+    return doc
+
+
+def _clean_symbol(symbol):
+    """First symbol of an issuerTradingSymbol value in SEC's form (BRK-B), or None."""
+    symbol = symbol.strip().upper()
+    if symbol in _NO_SYMBOL:
+        return None
+    symbol = _symbol_split_re.split(symbol.replace(".", "-"))[0]
+    if symbol in _NO_SYMBOL or not _symbol_re.match(symbol):
+        return None
+    return symbol
+
+
+def issuer_ticker(doc):
+    """Ticker to store a filing's trades under: the listed ticker for the
+    issuer CIK, else the cleaned trading symbol from the filing.
+    """
+    try:
+        ticker = ticker_for_cik(doc["issuer_cik"])
+    except (TypeError, ValueError):
+        ticker = None
+    return ticker or _clean_symbol(doc["ticker"])
+
+
+def _same_cik(cik, other):
+    try:
+        return int(cik) == int(other)
+    except (TypeError, ValueError):
+        return False
+
+
+def form4_trades(doc, filing_date=None, accession_no=None, ticker=None, issuer_cik=None):
+    """Convert a parsed Form 4 into InsiderTrade-shaped trade dicts.
+    With issuer_cik, filings about any other issuer yield no trades.
+    """
+    if issuer_cik is not None and not _same_cik(doc["issuer_cik"], issuer_cik):
+        return []
+    ticker = ticker or issuer_ticker(doc)
+    if not ticker:
+        return []
+    trades = []
+    for txn_index, txn in enumerate(doc["transactions"]):
+        shares, price = txn["shares"], txn["price"]
+        trades.append({
+            "ticker": ticker,
+            "insider_name": doc["owner_name"],
+            "title": doc["owner_title"],
+            "trade_type": txn["trade_type"],
+            "shares": shares,
+            "price": round(price, 2),
+            "value": round(shares * price, 2),
+            "filing_date": filing_date.strftime("%Y-%m-%d") if filing_date else txn["date"],
+            "accession_no": accession_no,
+            "txn_index": txn_index,
+        })
+    return trades
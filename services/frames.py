@@ -0,0 +1,29 @@
+"""
+JSON-ready conversion of statement DataFrames (rows = line items, columns = periods).
+"""
+import numpy as np
+import pandas as pd
+
+
+def _float_values(df):
+    """The frame as a float64 array; anything non-numeric becomes NaN."""
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+        return df.to_numpy(dtype=float, na_value=np.nan)
+    return df.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def frame_to_dict(df, columns_key, column_label=str):
+    """Convert a statement frame to {columns_key: [column labels], row label: [values]}.
+    Values are floats, with None for missing or non-numeric cells.
+    """
+    values = _float_values(df)
+    rows = values.tolist()
+    missing = np.isnan(values)
+    for i in np.flatnonzero(missing.any(axis=1)):
+        row = rows[i]
+        for j in np.flatnonzero(missing[i]):
+            row[j] = None
+
+    result = {columns_key: [column_label(c) for c in df.columns]}
+    result.update(zip(map(str, df.index), rows))
+    return result
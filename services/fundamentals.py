@@ -0,0 +1,189 @@
+"""
+Multi-year fundamentals store with a columnar on-disk layout.
+
+    data/fundamentals/<TICKER>/manifest.json
+    data/fundamentals/<TICKER>/<annual|quarterly>/periods.npy   (datetime64[D], sorted)
+    data/fundamentals/<TICKER>/<annual|quarterly>/<metric>.npy  (float64, NaN = missing)
+
+Every metric array is aligned with periods.npy and is read memory-mapped, so
+a ten-year series is a couple of small file reads. The manifest records which
+metrics exist and which filings have been folded in, so updates only add new
+periods, and when EDGAR was last checked for new filings (checked_at, set only
+by a full history sync). Arrays are replaced atomically; the manifest is
+written last.
+"""
+import json
+import os
+import re
+import threading
+from datetime import date, datetime
+import numpy as np
+from config import FUNDAMENTALS_DIR
+
+FREQS = ("annual", "quarterly")
+
+_ticker_re = re.compile(r"^[A-Z0-9][A-Z0-9.\-]{0,9}$")
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def _lock_for(ticker):
+    with _locks_lock:
+        return _locks.setdefault(ticker, threading.Lock())
+
+
+def valid_ticker(ticker):
+    """Whether ticker is a plain symbol, safe to use as a directory name."""
+    return bool(_ticker_re.match(ticker.upper()))
+
+
+def _ticker_dir(ticker):
+    if not valid_ticker(ticker):
+        raise ValueError(f"Invalid ticker: {ticker!r}")
+    return os.path.join(FUNDAMENTALS_DIR, ticker.upper())
+
+
+def _empty_section():
+    return {"periods": 0, "metrics": [], "accessions": [], "updated_at": None, "checked_at": None}
+
+
+def read_manifest(ticker):
+    """Return the ticker's manifest, with empty sections if nothing is stored."""
+    path = os.path.join(_ticker_dir(ticker), "manifest.json")
+    manifest = {"ticker": ticker.upper()}
+    try:
+        with open(path) as f:
+            manifest.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    for freq in FREQS:
+        section = manifest.setdefault(freq, _empty_section())
+        section.setdefault("checked_at", None)
+    return manifest
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _to_day(value):
+    if isinstance(value, np.datetime64):
+        return value.astype("datetime64[D]")
+    if isinstance(value, (datetime, date)):
+        return np.datetime64(value.strftime("%Y-%m-%d"), "D")
+    return np.datetime64(str(value)[:10], "D")
+
+
+def load_columns(ticker, freq="annual", metrics=None):
+    """Return (periods, {metric: array}) memory-mapped from the store.
+    Unknown metrics are skipped; periods is empty if nothing is stored.
+    """
+    section = read_manifest(ticker)[freq]
+    base = os.path.join(_ticker_dir(ticker), freq)
+    if not section["periods"]:
+        return np.array([], dtype="datetime64[D]"), {}
+    periods = np.load(os.path.join(base, "periods.npy"), mmap_mode="r")
+    names = section["metrics"] if metrics is None else [m for m in metrics if m in section["metrics"]]
+    return periods, {m: np.load(os.path.join(base, f"{m}.npy"), mmap_mode="r") for m in names}
+
+
+def upsert_periods(ticker, freq, rows, accessions=(), checked_at=None):
+    """Merge rows of (period_end, {metric: value}) into the store.
+    Values for an existing period overwrite the stored ones; None and NaN are ignored.
+    accessions are recorded as processed even if they produced no rows.
+    checked_at is passed only by a sync that has seen the full filing list.
+    """
+    if freq not in FREQS:
+        raise ValueError(f"Unknown frequency: {freq}")
+    ticker = ticker.upper()
+
+    with _lock_for(ticker):
+        manifest = read_manifest(ticker)
+        section = manifest[freq]
+        base = os.path.join(_ticker_dir(ticker), freq)
+        os.makedirs(base, exist_ok=True)
+
+        old_periods, old_columns = load_columns(ticker, freq)
+        new = {}
+        for period, values in rows:
+            slot = new.setdefault(_to_day(period), {})
+            slot.update({
+                k: v for k, v in values.items()
+                if isinstance(v, (int, float)) and not isinstance(v, bool) and v == v
+            })
+
+        if new:
+            periods = np.union1d(np.asarray(old_periods), np.array(sorted(new), dtype="datetime64[D]"))
+            metrics = sorted(set(section["metrics"]).union(*(v.keys() for v in new.values())))
+            old_pos = np.searchsorted(periods, old_periods)
+            for metric in metrics:
+                column = np.full(len(periods), np.nan)
+                if metric in old_columns:
+                    column[old_pos] = old_columns[metric]
+                for period, values in new.items():
+                    if metric in values:
+                        column[np.searchsorted(periods, period)] = values[metric]
+                _write_atomic(os.path.join(base, f"{metric}.npy"), lambda f, c=column: np.save(f, c))
+            _write_atomic(os.path.join(base, "periods.npy"), lambda f: np.save(f, periods))
+            section["periods"] = int(len(periods))
+            section["metrics"] = metrics
+
+        section["accessions"] = sorted(set(section["accessions"]).union(a for a in accessions if a))
+        section["updated_at"] = datetime.utcnow().isoformat()
+        if checked_at is not None:
+            section["checked_at"] = checked_at.isoformat()
+        _write_atomic(
+            os.path.join(_ticker_dir(ticker), "manifest.json"),
+            lambda f: f.write(json.dumps(manifest, indent=1).encode("utf-8")),
+        )
+    return section
+
+
+def cagr(periods, values):
+    """Compound annual growth rate (%) between the first and last valid values.
+    None when fewer than two positive values or less than a year apart.
+    """
+    valid = ~np.isnan(values)
+    if valid.sum() < 2:
+        return None
+    p, v = periods[valid], values[valid]
+    first, last = float(v[0]), float(v[-1])
+    years = (p[-1] - p[0]).astype("timedelta64[D]").astype(int) / 365.25
+    if first <= 0 or last <= 0 or years < 1:
+        return None
+    return round(float(((last / first) ** (1 / years) - 1) * 100), 2)
+
+
+def get_history(ticker, freq="annual", metrics=None, years=None):
+    """Return metric time series (oldest first) and CAGR for each metric."""
+    if freq not in FREQS:
+        return {"error": f"Unknown frequency: {freq} (use {', '.join(FREQS)})"}
+    if not valid_ticker(ticker):
+        return {"error": f"Invalid ticker: {ticker}"}
+    periods, columns = load_columns(ticker, freq, metrics)
+    if years and len(periods):
+        # 366 days a year so a period exactly `years` back (leap days included) is kept
+        start = periods[-1] - np.timedelta64(int(years * 366), "D")
+        first = int(np.searchsorted(periods, start))
+    else:
+        first = 0
+    periods = np.asarray(periods[first:])
+
+    series = {}
+    growth = {}
+    for metric, column in columns.items():
+        values = np.asarray(column[first:], dtype=float)
+        series[metric] = [None if np.isnan(x) else x for x in values.tolist()]
+        growth[metric] = cagr(periods, values)
+
+    return {
+        "ticker": ticker.upper(),
+        "freq": freq,
+        "periods": [str(p) for p in periods],
+        "series": series,
+        "cagr": growth,
+    }
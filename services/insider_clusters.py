@@ -0,0 +1,183 @@
+"""
+Market-wide insider buying clusters over stored trades.
+For each ticker, purchases sorted by filing date are swept with a sliding
+INSIDER_CLUSTER_WINDOW_DAYS window; wherever the window holds
+INSIDER_CLUSTER_MIN_INSIDERS distinct buyers, the overlapping windows are
+merged into one cluster episode. Episodes are materialized in the
+insider_clusters table and recomputed only for tickers that receive new trades.
+"""
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from config import INSIDER_CLUSTER_WINDOW_DAYS, INSIDER_CLUSTER_MIN_INSIDERS
+from database.connection import get_session
+from database.models import InsiderTrade, InsiderCluster
+from services.alert_engine import notify_insider_clusters
+
+PURCHASE_TYPES = ("purchase", "p", "buy")
+REBUILD_CHUNK = 500  # tickers recomputed per query during a full rebuild
+
+
+def _trade_dict(row):
+    return {
+        "ticker": row.ticker,
+        "insider_name": row.insider_name or "",
+        "title": row.title or "",
+        "trade_type": row.trade_type or "",
+        "shares": row.shares or 0,
+        "price": row.price or 0,
+        "value": row.value or 0,
+        "filing_date": row.filing_date.strftime("%Y-%m-%d") if row.filing_date else "",
+    }
+
+
+def _sweep(buys, window, min_insiders):
+    """Return [lo, hi] index ranges of merged cluster episodes in date-sorted buys."""
+    episodes = []
+    counts = {}
+    lo = 0
+    for hi, row in enumerate(buys):
+        name = row.insider_name or "Unknown"
+        counts[name] = counts.get(name, 0) + 1
+        while row.filing_date - buys[lo].filing_date > window:
+            old = buys[lo].insider_name or "Unknown"
+            counts[old] -= 1
+            if not counts[old]:
+                del counts[old]
+            lo += 1
+        if len(counts) >= min_insiders:
+            if episodes and lo <= episodes[-1][1]:
+                episodes[-1][1] = hi  # window overlaps the current episode
+            else:
+                episodes.append([lo, hi])
+    return episodes
+
+
+def _episode(ticker, rows):
+    # Largest trade per insider, as in the per-request detector this replaces
+    best = {}
+    for row in rows:
+        name = row.insider_name or "Unknown"
+        if name not in best or (row.value or 0) > (best[name].value or 0):
+            best[name] = row
+    trades = sorted((_trade_dict(r) for r in best.values()), key=lambda t: t["value"], reverse=True)
+    return InsiderCluster(
+        ticker=ticker,
+        start_date=rows[0].filing_date,
+        end_date=rows[-1].filing_date,
+        insider_count=len(best),
+        total_value=sum(t["value"] for t in trades),
+        trades_json=json.dumps(trades),
+    )
+
+
+def _compute(session, tickers, window, min_insiders):
+    rows = (
+        session.query(InsiderTrade)
+        .filter(
+            InsiderTrade.ticker.in_(tickers),
+            InsiderTrade.filing_date != None,
+            func.lower(InsiderTrade.trade_type).in_(PURCHASE_TYPES),
+        )
+        .order_by(InsiderTrade.ticker, InsiderTrade.filing_date, InsiderTrade.id)
+        .all()
+    )
+    by_ticker = {}
+    for row in rows:
+        by_ticker.setdefault(row.ticker, []).append(row)
+
+    clusters = []
+    for ticker, buys in by_ticker.items():
+        for lo, hi in _sweep(buys, window, min_insiders):
+            clusters.append(_episode(ticker, buys[lo:hi + 1]))
+    return clusters
+
+
+def refresh_clusters(tickers, now=None):
+    """Recompute the cluster episodes of the given tickers.
+    Recent episodes that are new or gained insiders are queued for alerts.
+    """
+    tickers = sorted(set(tickers))
+    if not tickers:
+        return []
+    now = now or datetime.utcnow()
+    window = timedelta(days=INSIDER_CLUSTER_WINDOW_DAYS)
+
+    session = get_session()
+    try:
+        # Plain columns, not ORM objects: the bulk delete below leaves loaded
+        # objects in the identity map, where reused rowids would collide
+        previous = {}
+        old = session.query(
+            InsiderCluster.ticker, InsiderCluster.start_date, InsiderCluster.end_date, InsiderCluster.insider_count,
+        ).filter(InsiderCluster.ticker.in_(tickers))
+        for ticker, start, end, count in old:
+            previous.setdefault(ticker, []).append((start, end, count))
+
+        clusters = _compute(session, tickers, window, INSIDER_CLUSTER_MIN_INSIDERS)
+        session.query(InsiderCluster).filter(InsiderCluster.ticker.in_(tickers)).delete(synchronize_session=False)
+        for c in clusters:
+            c.updated_at = now
+        session.add_all(clusters)
+        session.commit()
+
+        fresh = []
+        for c in clusters:
+            if c.end_date < now - window:
+                continue
+            grown = all(
+                end < c.start_date or start > c.end_date or count < c.insider_count
+                for start, end, count in previous.get(c.ticker, ())
+            )
+            if grown:
+                fresh.append(_cluster_to_dict(c))
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    notify_insider_clusters(fresh)
+    return fresh
+
+
+def rebuild_clusters():
+    """Recompute cluster episodes for every ticker with stored trades."""
+    session = get_session()
+    try:
+        tickers = [t for (t,) in session.query(InsiderTrade.ticker).distinct()]
+    finally:
+        session.close()
+    for i in range(0, len(tickers), REBUILD_CHUNK):
+        refresh_clusters(tickers[i:i + REBUILD_CHUNK])
+    return len(tickers)
+
+
+def _cluster_to_dict(c):
+    return {
+        "ticker": c.ticker,
+        "insider_count": c.insider_count,
+        "total_value": c.total_value,
+        "start_date": c.start_date.strftime("%Y-%m-%d"),
+        "end_date": c.end_date.strftime("%Y-%m-%d"),
+        "trades": json.loads(c.trades_json) if c.trades_json else [],
+    }
+
+
+def list_clusters(days=INSIDER_CLUSTER_WINDOW_DAYS, min_insiders=INSIDER_CLUSTER_MIN_INSIDERS, limit=200):
+    """Cluster episodes whose latest buy was filed within the last `days`,
+    largest total value first.
+    """
+    cutoff = datetime.now() - timedelta(days=days)
+    session = get_session()
+    try:
+        rows = (
+            session.query(InsiderCluster)
+            .filter(InsiderCluster.end_date >= cutoff, InsiderCluster.insider_count >= min_insiders)
+            .order_by(InsiderCluster.total_value.desc())
+            .limit(limit)
+            .all()
+        )
+        return [_cluster_to_dict(c) for c in rows]
+    finally:
+        session.close()
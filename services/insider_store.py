@@ -0,0 +1,168 @@
+"""
+Persistent insider trade store.
+Form 4 transactions are keyed by (accession_no, txn_index) so re-syncing a
+filing never duplicates rows. Per-ticker sync state records the newest filing
+stored, letting the next sync stop as soon as it reaches known filings.
+Storing trades recomputes the cluster episodes of the tickers involved.
+"""
+from datetime import datetime
+from sqlalchemy.dialects.sqlite import insert
+from database.connection import get_session
+from database.models import InsiderTrade, InsiderSyncState
+from services.insider_clusters import refresh_clusters
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(value[:10], "%Y-%m-%d")
+
+
+def _row_to_trade(row):
+    return {
+        "ticker": row.ticker,
+        "insider_name": row.insider_name or "",
+        "title": row.title or "",
+        "trade_type": row.trade_type or "",
+        "shares": row.shares or 0,
+        "price": row.price or 0,
+        "value": row.value or 0,
+        "filing_date": row.filing_date.strftime("%Y-%m-%d") if row.filing_date else "",
+        "accession_no": row.accession_no,
+    }
+
+
+def _insert_trades(session, trades, now):
+    if not trades:
+        return
+    stmt = insert(InsiderTrade).on_conflict_do_nothing(index_elements=["accession_no", "txn_index"])
+    session.execute(stmt, [
+        {
+            "ticker": t["ticker"],
+            "insider_name": t.get("insider_name", ""),
+            "title": t.get("title", ""),
+            "trade_type": t.get("trade_type", ""),
+            "shares": t.get("shares", 0),
+            "price": t.get("price", 0),
+            "value": t.get("value", 0),
+            "filing_date": _parse_date(t.get("filing_date")),
+            "accession_no": t["accession_no"],
+            "txn_index": t["txn_index"],
+            "fetched_at": now,
+        }
+        for t in trades
+    ])
+
+
+def _refresh_clusters(trades):
+    tickers = {t["ticker"] for t in trades}
+    if not tickers:
+        return
+    try:
+        refresh_clusters(tickers)
+    except Exception as e:
+        print(f"[insider_store] Failed to refresh clusters: {e}")
+
+
+def store_trades(trades):
+    """Bulk insert parsed trades, ignoring ones already stored.
+    Each trade needs ticker, accession_no and txn_index.
+    """
+    session = get_session()
+    try:
+        _insert_trades(session, trades, datetime.utcnow())
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    _refresh_clusters(trades)
+
+
+def save_sync(ticker, trades, last_accession, last_filing_date, synced_at=None):
+    """Store a ticker's newly synced trades and its sync state in one transaction."""
+    synced_at = synced_at or datetime.utcnow()
+    session = get_session()
+    try:
+        _insert_trades(session, trades, synced_at)
+        stmt = insert(InsiderSyncState).values(
+            ticker=ticker, last_accession=last_accession,
+            last_filing_date=last_filing_date, synced_at=synced_at,
+        )
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=["ticker"],
+            set_={
+                "last_accession": stmt.excluded.last_accession,
+                "last_filing_date": stmt.excluded.last_filing_date,
+                "synced_at": stmt.excluded.synced_at,
+            },
+        ))
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    _refresh_clusters(trades)
+
+
+def get_sync_state(ticker):
+    """Return the ticker's InsiderSyncState row, or None if never synced."""
+    session = get_session()
+    try:
+        state = session.query(InsiderSyncState).filter(InsiderSyncState.ticker == ticker).first()
+        if state is not None:
+            session.expunge(state)
+        return state
+    finally:
+        session.close()
+
+
+def stored_accessions(ticker, since):
+    """Accession numbers already stored for a ticker on or after a filing date."""
+    session = get_session()
+    try:
+        rows = (
+            session.query(InsiderTrade.accession_no)
+            .filter(InsiderTrade.ticker == ticker, InsiderTrade.filing_date >= since)
+            .distinct()
+        )
+        return {accession for (accession,) in rows if accession}
+    finally:
+        session.close()
+
+
+def load_trades(ticker, since):
+    """Stored trades for a ticker filed on or after since, newest first."""
+    session = get_session()
+    try:
+        rows = (
+            session.query(InsiderTrade)
+            .filter(InsiderTrade.ticker == ticker, InsiderTrade.filing_date >= since)
+            .order_by(InsiderTrade.filing_date.desc(), InsiderTrade.id)
+            .all()
+        )
+        return [_row_to_trade(row) for row in rows]
+    finally:
+        session.close()
+
+
+def known_accessions(accessions):
+    """Subset of the given accession numbers that already have stored trades."""
+    accessions = list(accessions)
+    found = set()
+    session = get_session()
+    try:
+        for i in range(0, len(accessions), 500):
+            rows = (
+                session.query(InsiderTrade.accession_no)
+                .filter(InsiderTrade.accession_no.in_(accessions[i:i + 500]))
+                .distinct()
+            )
+            found.update(accession for (accession,) in rows)
+        return found
+    finally:
+        session.close()
@@ -1,173 +1,244 @@
 """
 Insider trading via SEC EDGAR Form 4 filings using edgartools.
-Detects buying clusters (3+ insiders buying within 30 days).
+Trades are synced incrementally into the InsiderTrade table (only filings newer
+than the last sync are fetched) and served from there. Tickers and filings are
+fetched on bounded worker pools; every EDGAR request goes through the shared
+SEC rate limiter. Buying clusters (3+ insiders buying within 30 days) are
+maintained market-wide by services.insider_clusters as trades are stored.
 """
-import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from config import INSIDER_CACHE_TTL
+from config import (
+    INSIDER_CACHE_TTL, INSIDER_TICKER_WORKERS, INSIDER_FILING_WORKERS, INSIDER_SCAN_DEADLINE,
+    INSIDER_BACKFILL_DAYS, INSIDER_SYNC_MAX_FILINGS, INSIDER_CLUSTER_WINDOW_DAYS, INSIDER_CLUSTER_MIN_INSIDERS,
+)
+from services.cache import get_cache
+from services.form4_parser import TRADE_TYPES, parse_form4_xml, form4_trades
+from services.insider_clusters import list_clusters
+from services.insider_store import get_sync_state, load_trades, save_sync, stored_accessions
+from services.rate_limit import sec_limiter
 
-_cache = {}
+_cache = get_cache("insiders")
 
+# Separate pools: ticker tasks block on filing tasks, so they must not share workers
+_ticker_pool = ThreadPoolExecutor(max_workers=INSIDER_TICKER_WORKERS, thread_name_prefix="insider-ticker")
+_filing_pool = ThreadPoolExecutor(max_workers=INSIDER_FILING_WORKERS, thread_name_prefix="insider-filing")
 
-def get_insider_trades(ticker, days=90):
-    """Fetch insider trades for a ticker from SEC EDGAR Form 4 filings."""
-    cache_key = f"insider_{ticker}_{days}"
-    now = time.time()
-    if cache_key in _cache and now - _cache[cache_key]["ts"] < INSIDER_CACHE_TTL:
-        return _cache[cache_key]["data"]
+CLUSTER_TICKERS = [
+    "AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA",
+    "JPM", "BAC", "WFC", "GS", "MS",
+    "JNJ", "PFE", "UNH", "MRK", "ABBV",
+    "XOM", "CVX", "COP",
+    "DIS", "NFLX", "CMCSA",
+]
+
+
+def _needs_sync(state):
+    return state is None or state.synced_at is None or \
+        datetime.utcnow() - state.synced_at > timedelta(seconds=INSIDER_CACHE_TTL)
 
+
+def get_insider_trades(ticker, days=90):
+    """Return insider trades for a ticker from the local store.
+    A ticker that was never synced is synced from SEC EDGAR first; once
+    trades are stored, a sync older than INSIDER_CACHE_TTL runs in the
+    background and the stored trades are returned marked stale.
+    """
+    state = get_sync_state(ticker)
+    since = datetime.now() - timedelta(days=days)
+    if state is None:
+        try:
+            _cache.singleflight(("sync", ticker), lambda: sync_insider_trades(ticker))
+        except Exception as e:
+            return {"error": str(e), "trades": [], "ticker": ticker}
+    elif _needs_sync(state):
+        _cache.refresh(("sync", ticker), lambda: sync_insider_trades(ticker))
+        return {"trades": load_trades(ticker, since), "ticker": ticker, "stale": True}
+
+    return {"trades": load_trades(ticker, since), "ticker": ticker}
+
+
+def _filing_date(filing):
+    filing_date = None
+    if hasattr(filing, 'filing_date'):
+        filing_date = filing.filing_date
+    elif hasattr(filing, 'date'):
+        filing_date = filing.date
+
+    if filing_date:
+        if isinstance(filing_date, str):
+            filing_date = datetime.strptime(filing_date, "%Y-%m-%d")
+        elif hasattr(filing_date, 'to_pydatetime'):
+            filing_date = filing_date.to_pydatetime()
+        elif not isinstance(filing_date, datetime):
+            filing_date = datetime(filing_date.year, filing_date.month, filing_date.day)
+    return filing_date
+
+
+def parse_form4_filing(filing, ticker=None, filing_date=None, issuer_cik=None):
+    """Download and parse one Form 4 filing into trade dicts.
+    Without a ticker, trades go under form4_parser.issuer_ticker (the issuer
+    CIK's listed ticker, else its cleaned trading symbol);
+    with issuer_cik, a filing about another issuer yields no trades.
+    The XML goes through the streaming parser; edgartools' object model is
+    only used when the filing has no XML document.
+    """
+    if filing_date is None:
+        filing_date = _filing_date(filing)
+    accession = getattr(filing, "accession_no", None)
+
+    xml = None
+    if hasattr(filing, 'xml'):
+        sec_limiter.acquire()
+        xml = filing.xml()
+    if xml:
+        return form4_trades(parse_form4_xml(xml), filing_date, accession, ticker, issuer_cik)
+
+    sec_limiter.acquire()
+    return _trades_from_obj(filing.obj(), ticker, filing_date, accession, issuer_cik)
+
+
+def _owner_title_from_obj(owner):
+    if getattr(owner, "officer_title", None):
+        return str(owner.officer_title)
+    if getattr(owner, "is_director", False):
+        return "Director"
+    if getattr(owner, "is_ten_pct_owner", False):
+        return "10% Owner"
+    return str(getattr(owner, "position", None) or "")
+
+
+def _number(value, cast):
     try:
-        from edgar import Company
-        company = Company(ticker)
-        filings = company.get_filings(form="4")
-
-        if not filings or len(filings) == 0:
-            return {"trades": [], "ticker": ticker}
-
-        cutoff = datetime.now() - timedelta(days=days)
-        trades = []
-
-        # Process up to 50 most recent filings
-        for filing in filings[:50]:
-            try:
-                filing_date = None
-                if hasattr(filing, 'filing_date'):
-                    filing_date = filing.filing_date
-                elif hasattr(filing, 'date'):
-                    filing_date = filing.date
-
-                if filing_date:
-                    if isinstance(filing_date, str):
-                        filing_date = datetime.strptime(filing_date, "%Y-%m-%d")
-                    elif hasattr(filing_date, 'to_pydatetime'):
-                        filing_date = filing_date.to_pydatetime()
-
-                    if filing_date < cutoff:
-                        continue
-
-                # Try to parse the Form 4 XML
-                form4 = filing.obj()
-                if form4 is None:
-                    continue
-
-                insider_name = ""
-                insider_title = ""
-
-                if hasattr(form4, 'reporting_owner'):
-                    owner = form4.reporting_owner
-                    if hasattr(owner, 'name'):
-                        insider_name = str(owner.name)
-                    if hasattr(owner, 'title'):
-                        insider_title = str(owner.title)
-
-                # Extract transactions
-                transactions = []
-                if hasattr(form4, 'transactions'):
-                    transactions = form4.transactions if form4.transactions else []
-                elif hasattr(form4, 'non_derivative_transactions'):
-                    transactions = form4.non_derivative_transactions or []
-
-                for txn in transactions:
-                    trade_type = "Unknown"
-                    shares = 0
-                    price = 0
-
-                    if hasattr(txn, 'acquired_disposed'):
-                        ad = str(txn.acquired_disposed).upper()
-                        trade_type = "Purchase" if ad == "A" else "Sale"
-                    elif hasattr(txn, 'transaction_code'):
-                        code = str(txn.transaction_code).upper()
-                        trade_type = "Purchase" if code == "P" else "Sale" if code == "S" else code
-
-                    if hasattr(txn, 'shares'):
-                        shares = int(txn.shares or 0)
-                    elif hasattr(txn, 'transaction_shares'):
-                        shares = int(txn.transaction_shares or 0)
-
-                    if hasattr(txn, 'price'):
-                        price = float(txn.price or 0)
-                    elif hasattr(txn, 'price_per_share'):
-                        price = float(txn.price_per_share or 0)
-
-                    value = shares * price
-
-                    trades.append({
-                        "ticker": ticker,
-                        "insider_name": insider_name,
-                        "title": insider_title,
-                        "trade_type": trade_type,
-                        "shares": shares,
-                        "price": round(price, 2),
-                        "value": round(value, 2),
-                        "filing_date": filing_date.strftime("%Y-%m-%d") if filing_date else "",
-                    })
-
-            except Exception:
-                continue
-
-        # Sort by date descending
-        trades.sort(key=lambda t: t.get("filing_date", ""), reverse=True)
-        result = {"trades": trades, "ticker": ticker}
-
-        _cache[cache_key] = {"ts": now, "data": result}
-        return result
-
-    except Exception as e:
-        return {"error": str(e), "trades": [], "ticker": ticker}
-
-
-def detect_clusters(days=90, min_insiders=3):
-    """Detect buying clusters: tickers where 3+ insiders bought within 30 days."""
-    # Screen a set of popular tickers for insider buying activity
-    tickers_to_check = [
-        "AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA",
-        "JPM", "BAC", "WFC", "GS", "MS",
-        "JNJ", "PFE", "UNH", "MRK", "ABBV",
-        "XOM", "CVX", "COP",
-        "DIS", "NFLX", "CMCSA",
-    ]
-
-    clusters = []
-    cutoff_30d = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
-
-    for ticker in tickers_to_check:
+        return cast(float(value)) if value is not None and value == value else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def _doc_from_obj(form4):
+    """Build a parse_form4_xml-shaped document from an edgartools Form4."""
+    issuer = getattr(form4, "issuer", None)
+    owners = getattr(getattr(form4, "reporting_owners", None), "owners", None) or []
+    doc = {
+        "ticker": str(getattr(issuer, "ticker", None) or "").strip().upper(),
+        "issuer_name": str(getattr(issuer, "name", None) or ""),
+        "issuer_cik": str(getattr(issuer, "cik", None) or ""),
+        "owner_name": "",
+        "owner_title": "",
+        "transactions": [],
+    }
+    if owners:
+        # Same first-owner, as-filed name the XML parser stores
+        doc["owner_name"] = str(owners[0].name_unreversed or owners[0].name or "")
+        doc["owner_title"] = _owner_title_from_obj(owners[0])
+
+    table = getattr(form4, "non_derivative_table", None)
+    transactions = getattr(table, "transactions", None) if table is not None else None
+    data = getattr(transactions, "data", None)
+    if data is None:
+        return doc
+    for row in data.to_dict("records"):
+        code = str(row.get("Code") or "").upper()
+        doc["transactions"].append({
+            "date": str(row.get("Date") or ""),
+            "code": code,
+            "trade_type": TRADE_TYPES.get(code, code or "Unknown"),
+            "shares": _number(row.get("Shares"), int),
+            "price": _number(row.get("Price"), float),
+            "acquired_disposed": str(row.get("AcquiredDisposed") or "").upper(),
+        })
+    return doc
+
+
+def _trades_from_obj(form4, ticker, filing_date, accession, issuer_cik=None):
+    """Extract trade dicts from an edgartools Form 4 object."""
+    if form4 is None:
+        return []
+    return form4_trades(_doc_from_obj(form4), filing_date, accession, ticker, issuer_cik)
+
+
+def sync_insider_trades(ticker):
+    """Fetch and store Form 4 filings newer than the ticker's last sync.
+    Returns the number of trades parsed.
+    """
+    from edgar import Company
+    state = get_sync_state(ticker)
+    sec_limiter.acquire()
+    company = Company(ticker)
+    sec_limiter.acquire()
+    filings = company.get_filings(form="4")
+    now = datetime.utcnow()
+
+    if not filings or len(filings) == 0:
+        save_sync(ticker, [], state and state.last_accession, state and state.last_filing_date, now)
+        return 0
+
+    if state is not None and state.last_filing_date is not None:
+        cutoff = state.last_filing_date
+    else:
+        cutoff = datetime.now() - timedelta(days=INSIDER_BACKFILL_DAYS)
+    # Filings sharing the cutoff date may already be stored
+    known = stored_accessions(ticker, cutoff)
+
+    # Filings are newest first: stop at the last synced one or the cutoff date
+    pending = []
+    for filing in filings[:INSIDER_SYNC_MAX_FILINGS]:
+        accession = getattr(filing, "accession_no", None)
+        if state is not None and accession and accession == state.last_accession:
+            break
         try:
-            data = get_insider_trades(ticker, days=days)
-            trades = data.get("trades", [])
-
-            # Filter to buys in last 30 days
-            recent_buys = [
-                t for t in trades
-                if t.get("trade_type", "").lower() in ("purchase", "p", "buy")
-                and t.get("filing_date", "") >= cutoff_30d
-            ]
-
-            # Group by unique insider
-            insiders = {}
-            for t in recent_buys:
-                name = t.get("insider_name", "Unknown")
-                if name not in insiders:
-                    insiders[name] = []
-                insiders[name].append(t)
-
-            if len(insiders) >= min_insiders:
-                cluster_trades = []
-                for name, ts in insiders.items():
-                    # Pick the largest trade per insider
-                    best = max(ts, key=lambda x: x.get("value", 0))
-                    cluster_trades.append(best)
-
-                cluster_trades.sort(key=lambda x: x.get("value", 0), reverse=True)
-
-                clusters.append({
-                    "ticker": ticker,
-                    "insider_count": len(insiders),
-                    "total_value": sum(t.get("value", 0) for t in cluster_trades),
-                    "trades": cluster_trades,
-                })
-
+            filing_date = _filing_date(filing)
         except Exception:
             continue
-
-    clusters.sort(key=lambda c: c.get("total_value", 0), reverse=True)
-    return {"clusters": clusters}
+        if filing_date and filing_date < cutoff:
+            break
+        if accession and accession not in known:
+            # The company's filings include Form 4s it filed as a reporting owner
+            # of another issuer; matching the issuer CIK keeps only its own, stored
+            # under the requested ticker whatever symbol the filing carries
+            pending.append((filing, filing_date, _filing_pool.submit(
+                parse_form4_filing, filing, ticker, filing_date, company.cik)))
+
+    trades = []
+    failed_dates = []
+    for filing, filing_date, future in pending:
+        try:
+            trades.extend(future.result())
+        except Exception:
+            if filing_date:
+                failed_dates.append(filing_date)
+
+    newest = filings[0]
+    last_accession = getattr(newest, "accession_no", None)
+    last_filing_date = _filing_date(newest)
+    if failed_dates:
+        # Rescan from the oldest failed filing next time; stored ones are skipped
+        last_accession, last_filing_date = None, min(failed_dates)
+    elif not pending and state is not None:
+        last_accession, last_filing_date = state.last_accession, state.last_filing_date
+
+    save_sync(ticker, trades, last_accession, last_filing_date, now)
+    return len(trades)
+
+
+def detect_clusters(days=INSIDER_CLUSTER_WINDOW_DAYS, min_insiders=INSIDER_CLUSTER_MIN_INSIDERS,
+                    deadline=INSIDER_SCAN_DEADLINE):
+    """Return buying clusters (3+ insiders buying within 30 days) across every
+    stored ticker, from the materialized insider_clusters table.
+    Watchlist tickers whose sync is stale are synced concurrently first; if the
+    deadline passes, the table is read anyway with "partial": True and the
+    unfinished tickers listed in "pending" (their syncs keep running).
+    """
+    futures = {
+        _ticker_pool.submit(_cache.singleflight, ("sync", ticker), lambda t=ticker: sync_insider_trades(t)): ticker
+        for ticker in CLUSTER_TICKERS if _needs_sync(get_sync_state(ticker))
+    }
+    not_done = ()
+    if futures:
+        _, not_done = wait(futures, timeout=deadline)
+
+    result = {"clusters": list_clusters(days=days, min_insiders=min_insiders)}
+    if not_done:
+        result["partial"] = True
+        result["pending"] = sorted(futures[f] for f in not_done)
+    return result
@@ -0,0 +1,116 @@
+"""
+Listed-issuer universe for ticker extraction.
+Loads SEC's company_tickers.json (ISSUER_FILE) on first use into a compact
+index: a sorted tuple of interned symbols searched with bisect, company
+name aliases and a CIK -> ticker map. Falls back to the curated TICKER_MAP when the file is absent.
+"""
+import json
+import os
+import re
+import sys
+import threading
+from bisect import bisect_left
+from config import ISSUER_FILE
+from tickers import TICKER_MAP
+
+# Corporate suffixes stripped from SEC titles to get the name used in news
+_NAME_SUFFIXES = {
+    "inc", "corp", "corporation", "co", "company", "companies", "ltd", "limited",
+    "plc", "holdings", "holding", "group", "sa", "nv", "ag", "se", "lp", "llc",
+    "the", "de", "new", "class", "cl", "a", "b", "adr", "ads",
+}
+_word_re = re.compile(r"[a-z0-9]+(?:[&.][a-z0-9]+)*")
+
+_lock = threading.Lock()
+_universe = None
+
+
+class _Universe:
+    __slots__ = ("symbols", "aliases", "ciks")
+
+    def __init__(self, symbols, aliases, ciks):
+        self.symbols = symbols  # sorted tuple of interned symbols
+        self.aliases = aliases  # lowercase company name -> ticker
+        self.ciks = ciks        # int CIK -> primary ticker
+
+
+def _alias_for(title):
+    """Derive a news-style alias from an SEC title, e.g. "META PLATFORMS, INC."
+    -> "meta platforms". Single-word results are dropped: they are too often
+    ordinary words ("target", "visa") to match on their own.
+    """
+    words = _word_re.findall(title.lower())
+    while words and words[-1] in _NAME_SUFFIXES:
+        words.pop()
+    if words and words[0] == "the":
+        words = words[1:]
+    if len(words) < 2:
+        return None
+    return " ".join(words)
+
+
+def _read_issuer_file(path):
+    """Yield (ticker, title, cik) rows from an SEC company_tickers.json file."""
+    with open(path) as f:
+        data = json.load(f)
+    rows = data.values() if isinstance(data, dict) else data
+    for row in rows:
+        ticker = (row.get("ticker") or "").upper()
+        if ticker:
+            try:
+                cik = int(row.get("cik_str"))
+            except (TypeError, ValueError):
+                cik = None
+            yield ticker, row.get("title") or "", cik
+
+
+def _load():
+    symbols = set(TICKER_MAP)
+    aliases = {}
+    ciks = {}
+
+    if os.path.exists(ISSUER_FILE):
+        try:
+            for ticker, title, cik in _read_issuer_file(ISSUER_FILE):
+                symbols.add(ticker)
+                alias = _alias_for(title)
+                # File is ordered by size, so the primary share class wins
+                if alias:
+                    aliases.setdefault(sys.intern(alias), ticker)
+                if cik is not None:
+                    ciks.setdefault(cik, ticker)
+        except (OSError, ValueError) as e:
+            print(f"[issuers] Could not load {ISSUER_FILE}: {e}")
+
+    # Curated names take priority over derived aliases
+    for ticker, name in TICKER_MAP.items():
+        aliases[name.lower()] = ticker
+
+    return _Universe(tuple(sorted(sys.intern(s) for s in symbols)), aliases, ciks)
+
+
+def get_universe():
+    """Return the issuer index, loading it on first use."""
+    global _universe
+    if _universe is None:
+        with _lock:
+            if _universe is None:
+                _universe = _load()
+    return _universe
+
+
+def is_listed(symbol):
+    """Check whether a symbol is in the issuer universe."""
+    symbols = get_universe().symbols
+    i = bisect_left(symbols, symbol)
+    return i < len(symbols) and symbols[i] == symbol
+
+
+def company_aliases():
+    """Return the lowercase company name -> ticker map."""
+    return get_universe().aliases
+
+
+def ticker_for_cik(cik):
+    """Return the primary ticker for an SEC CIK, or None if it is not listed."""
+    return get_universe().ciks.get(int(cik))
@@ -2,10 +2,10 @@
 FRED economic indicators dashboard.
 Requires free FRED API key. Gracefully degrades without it.
 """
-import time
-from config import FRED_API_KEY, FRED_SERIES, MACRO_CACHE_TTL
+from config import FRED_API_KEY, FRED_SERIES
+from services.cache import get_cache
 
-_cache = {}
+_cache = get_cache("macro")
 
 
 def is_configured():
@@ -21,14 +21,13 @@ def _get_fred():
 
 def get_overview():
     """Fetch overview of all macro categories with latest values and history."""
-    cache_key = "macro_overview"
-    now = time.time()
-    if cache_key in _cache and now - _cache[cache_key]["ts"] < MACRO_CACHE_TTL:
-        return _cache[cache_key]["data"]
-
     if not is_configured():
         return {"error": "FRED API key not configured"}
 
+    return _cache.get_or_load("macro_overview", _fetch_overview)
+
+
+def _fetch_overview():
     fred = _get_fred()
     categories = {}
 
@@ -77,9 +76,7 @@ def get_overview():
             "indicators": indicators,
         }
 
-    result = {"categories": categories}
-    _cache[cache_key] = {"ts": now, "data": result}
-    return result
+    return {"categories": categories}
 
 
 def get_category(category):
@@ -90,11 +87,10 @@ def get_category(category):
     if category not in FRED_SERIES:
         return {"error": f"Unknown category: {category}"}
 
-    cache_key = f"macro_cat_{category}"
-    now = time.time()
-    if cache_key in _cache and now - _cache[cache_key]["ts"] < MACRO_CACHE_TTL:
-        return _cache[cache_key]["data"]
+    return _cache.get_or_load(f"macro_cat_{category}", lambda: _fetch_category(category))
 
+
+def _fetch_category(category):
     fred = _get_fred()
     series_dict = FRED_SERIES[category]
     indicators = []
@@ -136,10 +132,7 @@ def get_category(category):
             })
 
     cat_name = category.replace("_", " ").title()
-    result = {"category": category, "name": cat_name, "indicators": indicators}
-
-    _cache[cache_key] = {"ts": now, "data": result}
-    return result
+    return {"category": category, "name": cat_name, "indicators": indicators}
 
 
 def get_recession_probability():
@@ -147,11 +140,10 @@ def get_recession_probability():
     if not is_configured():
         return {"error": "FRED API key not configured"}
 
-    cache_key = "recession_prob"
-    now = time.time()
-    if cache_key in _cache and now - _cache[cache_key]["ts"] < MACRO_CACHE_TTL:
-        return _cache[cache_key]["data"]
+    return _cache.get_or_load("recession_prob", _fetch_recession_probability)
+
 
+def _fetch_recession_probability():
     fred = _get_fred()
     signals = []
 
@@ -197,6 +189,4 @@ def get_recession_probability():
     else:
         probability = 0.0
 
-    result = {"probability": probability, "signals_used": len(signals)}
-    _cache[cache_key] = {"ts": now, "data": result}
-    return result
+    return {"probability": probability, "signals_used": len(signals)}
@@ -0,0 +1,139 @@
+"""
+Persistent news article store.
+Articles are keyed by URL hash; ingestion only extracts tickers and scores
+sentiment for URLs not seen before, and stored history is paged by cursor.
+"""
+import json
+from datetime import datetime
+from sqlalchemy.dialects.sqlite import insert
+from database.connection import get_session
+from database.models import NewsArticle
+from services.alert_engine import notify_news
+from services.annotator import annotate_articles
+from services.sentiment import url_hash
+from services.ticker_sentiment import record_articles
+
+
+def _row_to_article(row):
+    return {
+        "id": row.id,
+        "title": row.title or "",
+        "url": row.url,
+        "description": row.description or "",
+        "source": row.source or "",
+        "age": row.age or "",
+        "thumbnail": row.thumbnail or "",
+        "tickers": json.loads(row.tickers_json) if row.tickers_json else [],
+        "sentiment": row.sentiment,
+        "sentiment_score": row.sentiment_score,
+        "fetched_at": row.fetched_at.isoformat() if row.fetched_at else None,
+    }
+
+
+def ingest_articles(articles):
+    """Annotate articles with tickers and sentiment, storing unseen ones.
+
+    Articles already in the store reuse their stored annotations; only new
+    URLs go through ticker extraction and sentiment scoring.
+    Returns (articles, all_tickers) like extract_tickers_from_articles.
+    """
+    hashes = [url_hash(art.get("url", "")) for art in articles]
+    session = get_session()
+    try:
+        known = {}
+        if hashes:
+            rows = session.query(NewsArticle).filter(NewsArticle.url_hash.in_(set(hashes))).all()
+            known = {row.url_hash: row for row in rows}
+
+        new_articles = []
+        new_hashes = set()
+        for art, h in zip(articles, hashes):
+            row = known.get(h)
+            if row is not None:
+                art["tickers"] = json.loads(row.tickers_json) if row.tickers_json else []
+                art["sentiment"] = row.sentiment
+                art["sentiment_score"] = row.sentiment_score
+            elif h not in new_hashes:
+                new_hashes.add(h)
+                new_articles.append(art)
+
+        if new_articles:
+            annotate_articles(new_articles)
+            now = datetime.utcnow()
+            stmt = (
+                insert(NewsArticle)
+                .on_conflict_do_nothing(index_elements=["url_hash"])
+                .returning(NewsArticle.url_hash)
+            )
+            result = session.execute(stmt, [
+                {
+                    "url_hash": url_hash(art.get("url", "")),
+                    "url": art.get("url", ""),
+                    "title": art.get("title", ""),
+                    "description": art.get("description", ""),
+                    "source": art.get("source", ""),
+                    "age": art.get("age", ""),
+                    "thumbnail": art.get("thumbnail", ""),
+                    "tickers_json": json.dumps(art["tickers"]),
+                    "sentiment": art["sentiment"],
+                    "sentiment_score": art["sentiment_score"],
+                    "fetched_at": now,
+                }
+                for art in new_articles
+            ])
+            inserted = set(result.scalars())
+            session.commit()
+
+            # A concurrent request may have stored some of these first; only
+            # the rows this call inserted count toward sentiment and alerts
+            stored = [art for art in new_articles if url_hash(art.get("url", "")) in inserted]
+            if stored:
+                try:
+                    record_articles(stored)
+                except Exception as e:
+                    print(f"[news_store] Could not update ticker sentiment: {e}")
+                notify_news(stored)
+
+        # Duplicate URLs within the batch share the first copy's annotations
+        by_hash = {h: art for art, h in zip(articles, hashes) if "tickers" in art}
+        all_tickers = set()
+        for art, h in zip(articles, hashes):
+            if "tickers" not in art:
+                src = by_hash[h]
+                art["tickers"] = src["tickers"]
+                art["sentiment"] = src["sentiment"]
+                art["sentiment_score"] = src["sentiment_score"]
+            all_tickers.update(art["tickers"])
+
+        return articles, list(all_tickers)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def list_articles(limit=50, cursor=None):
+    """Return stored articles newest first, paged by an id cursor."""
+    session = get_session()
+    try:
+        q = session.query(NewsArticle)
+        if cursor is not None:
+            q = q.filter(NewsArticle.id < cursor)
+        rows = q.order_by(NewsArticle.id.desc()).limit(limit + 1).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        articles = [_row_to_article(r) for r in rows]
+
+        all_tickers = set()
+        for art in articles:
+            all_tickers.update(art["tickers"])
+
+        return {
+            "articles": articles,
+            "tickers": list(all_tickers),
+            "next_cursor": rows[-1].id if has_more else None,
+        }
+    finally:
+        session.close()
@@ -0,0 +1,32 @@
+"""
+Thread-safe token bucket for outbound API rate limits.
+"""
+import threading
+import time
+from config import SEC_REQUESTS_PER_SECOND
+
+
+class RateLimiter:
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be made."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Shared by every thread that talks to SEC EDGAR
+sec_limiter = RateLimiter(SEC_REQUESTS_PER_SECOND)
@@ -3,12 +3,12 @@ Equity screener using yfinance for quick stock metrics.
 Supports template-based and custom filter screening with ~45 filters
 across Descriptive, Fundamental, and Technical categories.
 """
-import time
 import numpy as np
 import yfinance as yf
-from config import SCREENER_CACHE_TTL, SCREENER_TEMPLATES
+from config import SCREENER_TEMPLATES
+from services.cache import get_cache
 
-_cache = {}
+_cache = get_cache("screener")
 
 # Universe of popular US stocks to screen (S&P 500 subset + popular picks)
 SCREEN_UNIVERSE = [
@@ -309,10 +309,10 @@ def _apply_filters(stock, filters):
 def run_screen(filters):
     """Run a screen with custom filters. Returns matching stocks."""
     cache_key = f"screen_{hash(str(sorted(filters.items())))}"
-    now = time.time()
-    if cache_key in _cache and now - _cache[cache_key]["ts"] < SCREENER_CACHE_TTL:
-        return _cache[cache_key]["data"]
+    return _cache.get_or_load(cache_key, lambda: _screen(filters))
 
+
+def _screen(filters):
     need_tech = _needs_technicals(filters)
 
     results = []
@@ -328,8 +328,6 @@ def run_screen(filters):
 
     results.sort(key=lambda x: x.get("market_cap") or 0, reverse=True)
     data = {"results": results, "total_screened": len(SCREEN_UNIVERSE)}
-
-    _cache[cache_key] = {"ts": now, "data": data}
     return data
 
 
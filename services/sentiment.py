@@ -1,9 +1,20 @@
 """
 Keyword-based sentiment scoring for news headlines.
-Optional Claude-enhanced sentiment if ANTHROPIC_API_KEY is set.
+Optional Claude-enhanced sentiment if ANTHROPIC_API_KEY is set, either per
+headline or in batches of many headlines per request.
 """
 import hashlib
-from config import ANTHROPIC_API_KEY
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.dialects.sqlite import insert
+from config import ANTHROPIC_API_KEY, CLAUDE_BATCH_SIZE, CLAUDE_BATCH_WORKERS
+from database.connection import get_session
+from database.models import SentimentCache
+from services.ticker_extractor import tokenize
+
+CLAUDE_MODEL = "claude-haiku-4-5-20251001"
+CLAUDE_METHOD = "claude"
 
 # Keyword lexicon for financial sentiment
 BULLISH_KEYWORDS = {
@@ -32,20 +43,24 @@ BEARISH_KEYWORDS = {
 }
 
 
-def keyword_sentiment(text):
+def keyword_sentiment(text, text_lower=None, words=None):
     """Score sentiment using keyword matching.
     Returns (label, score) where label is 'bullish'/'bearish'/'neutral'
     and score is a float from -1.0 (max bearish) to +1.0 (max bullish).
+    Text is split with the ticker extractor's tokenizer, so every caller
+    scores the same words; callers that already lowercased/tokenized the
+    text can pass text_lower and words to skip that work.
     """
     if not text:
         return "neutral", 0.0
 
-    words = set(text.lower().split())
+    if text_lower is None:
+        text_lower = text.lower()
+    words = set(words if words is not None else tokenize(text_lower))
     bull_count = len(words & BULLISH_KEYWORDS)
     bear_count = len(words & BEARISH_KEYWORDS)
 
     # Also check multi-word patterns
-    text_lower = text.lower()
     for phrase in ("record high", "all-time high", "all time high"):
         if phrase in text_lower:
             bull_count += 2
@@ -81,30 +96,213 @@ def claude_sentiment_available():
     return bool(ANTHROPIC_API_KEY)
 
 
-def claude_sentiment(text):
-    """Use Claude API for sentiment analysis. Returns (label, score, reasoning)."""
+_client = None
+_client_lock = threading.Lock()
+
+
+def _get_client():
+    """Return a shared Anthropic client (reuses its HTTP connection pool)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import anthropic
+                _client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+    return _client
+
+
+def _cache_key(text, url=None):
+    return url_hash(url or text)
+
+
+def _load_cached(session, keys):
+    rows = session.query(SentimentCache).filter(
+        SentimentCache.url_hash.in_(set(keys)),
+        SentimentCache.method == CLAUDE_METHOD,
+    ).all()
+    return {row.url_hash: row for row in rows}
+
+
+def _store_cached(session, entries):
+    """Insert {key: (label, score, reason)} rows, ignoring keys already stored."""
+    if not entries:
+        return
+    stmt = insert(SentimentCache).on_conflict_do_nothing(index_elements=["url_hash"])
+    session.execute(stmt, [
+        {"url_hash": key, "sentiment": label, "score": score, "reason": reason, "method": CLAUDE_METHOD}
+        for key, (label, score, reason) in entries.items()
+    ])
+    session.commit()
+
+
+def claude_sentiment(text, url=None):
+    """Use Claude API for sentiment analysis. Returns (label, score, reasoning).
+    Results are stored in SentimentCache keyed by URL (or text) hash, so each
+    headline is only sent to the API once.
+    """
     if not ANTHROPIC_API_KEY:
         return None, None, "API key not configured"
 
+    key = _cache_key(text, url)
+    session = get_session()
     try:
-        import anthropic
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=150,
-            messages=[{
-                "role": "user",
-                "content": f"""Analyze the financial sentiment of this headline. Respond with ONLY a JSON object:
+        row = _load_cached(session, [key]).get(key)
+        if row is not None:
+            return row.sentiment, row.score, row.reason or ""
+
+        try:
+            response = _get_client().messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=150,
+                messages=[{
+                    "role": "user",
+                    "content": f"""Analyze the financial sentiment of this headline. Respond with ONLY a JSON object:
 {{"sentiment": "bullish" or "bearish" or "neutral", "score": float from -1.0 to 1.0, "reason": "brief reason"}}
 
 Headline: {text}"""
-            }],
-        )
-        import json
-        result = json.loads(response.content[0].text)
-        return result.get("sentiment", "neutral"), result.get("score", 0), result.get("reason", "")
-    except Exception as e:
-        return None, None, str(e)
+                }],
+            )
+            result = json.loads(response.content[0].text)
+            label = result.get("sentiment", "neutral")
+            score = result.get("score", 0)
+            reason = result.get("reason", "")
+        except Exception as e:
+            return None, None, str(e)
+
+        try:
+            _store_cached(session, {key: (label, score, reason)})
+        except Exception as e:
+            session.rollback()
+            print(f"[sentiment] Could not cache Claude sentiment: {e}")
+        return label, score, reason
+    finally:
+        session.close()
+
+
+def cached_claude_sentiments(articles):
+    """Return stored Claude sentiment for many articles with one query.
+    Takes dicts with 'url' and/or 'title'; returns {url or title: result}
+    for those already scored.
+    """
+    keys = {}
+    for art in articles:
+        ident = art.get("url") or art.get("title")
+        if ident:
+            keys[_cache_key(art.get("title", ""), art.get("url"))] = ident
+
+    if not keys:
+        return {}
+
+    session = get_session()
+    try:
+        rows = _load_cached(session, keys)
+        return {
+            keys[key]: {"sentiment": row.sentiment, "score": row.score, "reason": row.reason or ""}
+            for key, row in rows.items()
+        }
+    finally:
+        session.close()
+
+
+def _batch_prompt(headlines):
+    lines = "\n".join(f"{i}. {h}" for i, h in enumerate(headlines))
+    return f"""Analyze the financial sentiment of each numbered headline. Respond with ONLY a JSON array with one object per headline:
+[{{"i": headline number, "sentiment": "bullish" or "bearish" or "neutral", "score": float from -1.0 to 1.0, "reason": "brief reason"}}]
+
+Headlines:
+{lines}"""
+
+
+def _parse_batch_response(text, count):
+    """Parse the model's JSON array into {index: (label, score, reason)}."""
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end == -1:
+        raise ValueError("no JSON array in response")
+    parsed = {}
+    for item in json.loads(text[start:end + 1]):
+        try:
+            i = int(item["i"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= i < count:
+            parsed[i] = (item.get("sentiment", "neutral"), item.get("score", 0), item.get("reason", ""))
+    return parsed
+
+
+def _score_batch(client, headlines):
+    response = client.messages.create(
+        model=CLAUDE_MODEL,
+        max_tokens=100 + 60 * len(headlines),
+        messages=[{"role": "user", "content": _batch_prompt(headlines)}],
+    )
+    return _parse_batch_response(response.content[0].text, len(headlines))
+
+
+def claude_sentiment_batch(articles, client=None, batch_size=CLAUDE_BATCH_SIZE,
+                           max_workers=CLAUDE_BATCH_WORKERS, use_cache=True):
+    """Score many articles with Claude, packing batch_size headlines into each
+    request and running up to max_workers requests at once.
+
+    Returns one dict per article (same order) with sentiment, score, reason
+    and method: "claude", or "keyword" when the model call or its output
+    failed for that article. client defaults to the shared Anthropic client;
+    pass any object with a compatible messages.create() to run offline.
+    """
+    results = [None] * len(articles)
+    texts = [f"{a.get('title', '')} {a.get('description', '')}".strip() for a in articles]
+    keys = [_cache_key(a.get("title", ""), a.get("url")) for a in articles]
+
+    session = get_session() if use_cache else None
+    try:
+        if use_cache and keys:
+            cached = _load_cached(session, keys)
+            for i, key in enumerate(keys):
+                row = cached.get(key)
+                if row is not None:
+                    results[i] = {
+                        "sentiment": row.sentiment,
+                        "score": row.score,
+                        "reason": row.reason or "",
+                        "method": CLAUDE_METHOD,
+                    }
+
+        pending = [i for i, r in enumerate(results) if r is None]
+        if pending and (client is not None or ANTHROPIC_API_KEY):
+            client = client or _get_client()
+            batches = [pending[j:j + batch_size] for j in range(0, len(pending), batch_size)]
+
+            def run(batch):
+                try:
+                    return batch, _score_batch(client, [articles[i].get("title") or texts[i] for i in batch])
+                except Exception as e:
+                    print(f"[sentiment] Claude batch of {len(batch)} failed: {e}")
+                    return batch, {}
+
+            fresh = {}
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as pool:
+                for batch, parsed in pool.map(run, batches):
+                    for j, i in enumerate(batch):
+                        if j in parsed:
+                            label, score, reason = parsed[j]
+                            results[i] = {"sentiment": label, "score": score, "reason": reason, "method": CLAUDE_METHOD}
+                            fresh[keys[i]] = parsed[j]
+
+            if use_cache and fresh:
+                try:
+                    _store_cached(session, fresh)
+                except Exception as e:
+                    session.rollback()
+                    print(f"[sentiment] Could not cache Claude sentiment: {e}")
+
+        for i, r in enumerate(results):
+            if r is None:
+                label, score = keyword_sentiment(texts[i])
+                results[i] = {"sentiment": label, "score": score, "reason": "keyword fallback", "method": "keyword"}
+
+        return results
+    finally:
+        if session is not None:
+            session.close()
 
 
 def url_hash(url):
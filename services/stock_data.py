@@ -1,50 +1,114 @@
-import time
 import yfinance as yf
-from config import STOCK_CACHE_TTL
+from config import STOCK_BATCH_SIZE
+from services.alert_engine import notify_quotes
+from services.cache import get_cache, mark_stale
 
-_cache = {}
+_cache = get_cache("stocks")
+
+
+def _quote(ticker, price, prev_close):
+    if price and prev_close:
+        change = price - prev_close
+        change_pct = (change / prev_close) * 100
+    else:
+        change = 0
+        change_pct = 0
+
+    return {
+        "ticker": ticker,
+        "price": round(price, 2) if price else None,
+        "change": round(change, 2),
+        "change_pct": round(change_pct, 2),
+    }
 
 
 def get_stock_info(ticker):
-    now = time.time()
-    if ticker in _cache and now - _cache[ticker]["ts"] < STOCK_CACHE_TTL:
-        return _cache[ticker]["data"]
+    return _cache.get_or_load(ticker, lambda: _fetch_stock_info(ticker))
 
+
+def _fetch_stock_info(ticker):
     try:
         t = yf.Ticker(ticker)
         info = t.fast_info
         price = info.get("lastPrice", 0) or info.get("last_price", 0)
         prev_close = info.get("previousClose", 0) or info.get("previous_close", 0)
-
-        if price and prev_close:
-            change = price - prev_close
-            change_pct = (change / prev_close) * 100
-        else:
-            change = 0
-            change_pct = 0
-
-        result = {
-            "ticker": ticker,
-            "price": round(price, 2) if price else None,
-            "change": round(change, 2),
-            "change_pct": round(change_pct, 2),
-        }
+        result = _quote(ticker, price, prev_close)
     except Exception as e:
         print(f"[stock_data] Error fetching {ticker}: {e}")
-        result = {
-            "ticker": ticker,
-            "price": None,
-            "change": 0,
-            "change_pct": 0,
-        }
-
-    _cache[ticker] = {"ts": now, "data": result}
+        result = _quote(ticker, None, None)
+    notify_quotes({ticker: result})
     return result
 
 
-def get_multiple_stocks(tickers, max_batch=25):
-    tickers = list(set(tickers))[:max_batch]
+def _download_quotes(tickers):
+    """Fetch quotes for many tickers with one bulk download of recent daily bars.
+
+    The last two sessions give the latest price and the previous close.
+    Symbols missing from the download come back with an empty quote.
+    """
+    results = {}
+    try:
+        df = yf.download(
+            tickers,
+            period="5d",
+            interval="1d",
+            group_by="column",
+            auto_adjust=False,
+            threads=True,
+            progress=False,
+        )
+        close = df["Close"] if df is not None and not df.empty else None
+    except Exception as e:
+        print(f"[stock_data] Error downloading {len(tickers)} quotes: {e}")
+        close = None
+
+    for ticker in tickers:
+        price = prev_close = None
+        if close is not None and ticker in close:
+            series = close[ticker].dropna()
+            if len(series) >= 1:
+                price = float(series.iloc[-1])
+            if len(series) >= 2:
+                prev_close = float(series.iloc[-2])
+        results[ticker] = _quote(ticker, price, prev_close)
+    return results
+
+
+def _store_quotes(quotes):
+    for t, quote in quotes.items():
+        _cache.set(t, quote)
+    notify_quotes(quotes)
+    return quotes
+
+
+def get_multiple_stocks(tickers, batch_size=STOCK_BATCH_SIZE):
+    """Return quotes for all tickers, fetching cache misses in bulk batches.
+
+    Stale quotes are returned as-is and refreshed in the background.
+    """
+    tickers = list(dict.fromkeys(tickers))
+
     results = {}
+    missing = []
+    stale = []
     for t in tickers:
-        results[t] = get_stock_info(t)
+        cached, age = _cache.get_with_age(t)
+        if cached is None:
+            missing.append(t)
+            continue
+        if age >= _cache.ttl:
+            stale.append(t)
+            cached = mark_stale(cached, age)
+        results[t] = cached
+
+    for i in range(0, len(missing), batch_size):
+        batch = missing[i:i + batch_size]
+        # Identical concurrent batches (same news page) share one download
+        quotes = _cache.singleflight(("batch",) + tuple(batch), lambda: _store_quotes(_download_quotes(batch)))
+        results.update(quotes)
+
+    for i in range(0, len(stale), batch_size):
+        batch = stale[i:i + batch_size]
+        _cache.refresh(("batch",) + tuple(batch), lambda b=batch: _store_quotes(_download_quotes(b)))
+
     return results
@@ -0,0 +1,224 @@
+"""
+Asynchronous Telegram delivery for triggered alerts.
+Undelivered AlertLog rows are the durable outbound queue. A background worker
+drains them over one HTTP session, merges pending alerts for the same chat
+into one message, paces sends to Telegram's rate limits and retries failures
+with exponential backoff.
+Every process that creates the app runs a worker (the debug reloader runs
+two), so rows are claimed with a conditional UPDATE before sending and each
+row is sent by exactly one worker. A claim lapses after TELEGRAM_CLAIM_LEASE
+so rows held by a worker that died are picked up again.
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+import requests
+from sqlalchemy import select, update
+from config import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_POLL_INTERVAL, TELEGRAM_MAX_ATTEMPTS,
+    TELEGRAM_RETRY_BASE, TELEGRAM_CHAT_INTERVAL, TELEGRAM_GLOBAL_INTERVAL, TELEGRAM_CLAIM_LEASE,
+)
+from database.connection import get_session
+from database.models import AlertLog
+
+MAX_MESSAGE_LEN = 4096  # Telegram sendMessage limit
+BATCH_LIMIT = 200
+
+_session = requests.Session()
+_worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+_wake = threading.Event()
+_thread = None
+_start_lock = threading.Lock()
+
+_last_global_send = 0.0
+_last_chat_send = {}
+
+
+def telegram_configured():
+    """Check if Telegram delivery is available."""
+    return bool(TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID)
+
+
+class TelegramError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def post_message(chat_id, text):
+    """Send one message over the shared session. Raises TelegramError."""
+    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+    payload = {"chat_id": chat_id, "text": text, "parse_mode": "HTML"}
+    try:
+        resp = _session.post(url, json=payload, timeout=10)
+    except requests.RequestException as e:
+        raise TelegramError(str(e))
+
+    if resp.status_code == 429:
+        retry_after = None
+        try:
+            retry_after = resp.json().get("parameters", {}).get("retry_after")
+        except ValueError:
+            pass
+        raise TelegramError("rate limited by Telegram", retry_after=retry_after)
+    try:
+        resp.raise_for_status()
+    except requests.RequestException as e:
+        raise TelegramError(str(e))
+
+
+def _pace(chat_id):
+    """Sleep as needed to respect per-chat and bot-wide send rates."""
+    global _last_global_send
+    now = time.monotonic()
+    wait = max(
+        _last_chat_send.get(chat_id, 0.0) + TELEGRAM_CHAT_INTERVAL - now,
+        _last_global_send + TELEGRAM_GLOBAL_INTERVAL - now,
+    )
+    if wait > 0:
+        time.sleep(wait)
+    _last_global_send = _last_chat_send[chat_id] = time.monotonic()
+
+
+def _chunks(logs):
+    """Group logs into messages that fit Telegram's length limit.
+    Yields (logs, text) pairs.
+    """
+    group, parts, length = [], [], 0
+    for log in logs:
+        text = (log.message or "")[:MAX_MESSAGE_LEN]
+        extra = len(text) + (2 if parts else 0)
+        if parts and length + extra > MAX_MESSAGE_LEN:
+            yield group, "\n\n".join(parts)
+            group, parts, length = [], [], 0
+            extra = len(text)
+        group.append(log)
+        parts.append(text)
+        length += extra
+    if group:
+        yield group, "\n\n".join(parts)
+
+
+def _claim(session, now):
+    """Atomically claim up to BATCH_LIMIT due, undelivered logs for this worker.
+    Returns the claimed rows.
+    """
+    due = (
+        (AlertLog.delivered == False)
+        & ((AlertLog.attempts == None) | (AlertLog.attempts < TELEGRAM_MAX_ATTEMPTS))
+        & ((AlertLog.next_attempt_at == None) | (AlertLog.next_attempt_at <= now))
+        & ((AlertLog.claimed_at == None) | (AlertLog.claimed_at < now - timedelta(seconds=TELEGRAM_CLAIM_LEASE)))
+    )
+    candidates = select(AlertLog.id).where(due).order_by(AlertLog.id).limit(BATCH_LIMIT)
+    # One statement, so SQLite applies it atomically: a row another worker
+    # claimed first no longer matches `due`
+    session.execute(
+        update(AlertLog)
+        .where(AlertLog.id.in_(candidates), due)
+        .values(claimed_by=_worker_id, claimed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return (
+        session.query(AlertLog)
+        .filter(AlertLog.claimed_by == _worker_id, AlertLog.claimed_at == now, AlertLog.delivered == False)
+        .order_by(AlertLog.id)
+        .all()
+    )
+
+
+def drain_once(now=None):
+    """Claim and send every due, undelivered alert log. Returns the number delivered."""
+    now = now or datetime.utcnow()
+    session = get_session()
+    claimed = []
+    try:
+        logs = _claim(session, now)
+        claimed = [log.id for log in logs]
+
+        by_chat = {}
+        for log in logs:
+            by_chat.setdefault(log.chat_id or TELEGRAM_CHAT_ID, []).append(log)
+
+        delivered = 0
+        for chat_id, chat_logs in by_chat.items():
+            for group, text in _chunks(chat_logs):
+                _pace(chat_id)
+                try:
+                    post_message(chat_id, text)
+                except TelegramError as e:
+                    for log in group:
+                        log.attempts = (log.attempts or 0) + 1
+                        delay = e.retry_after or TELEGRAM_RETRY_BASE * 2 ** (log.attempts - 1)
+                        log.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+                        log.last_error = str(e)
+                        log.claimed_by = log.claimed_at = None
+                    session.commit()
+                    if e.retry_after:
+                        break  # this chat is throttled; leave the rest for later
+                    continue
+
+                sent_at = datetime.utcnow()
+                for log in group:
+                    log.delivered = True
+                    log.delivered_at = sent_at
+                    log.attempts = (log.attempts or 0) + 1
+                    log.claimed_by = log.claimed_at = None
+                session.commit()
+                delivered += len(group)
+
+        return delivered
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        _release(session, claimed)
+        session.close()
+
+
+def _release(session, ids):
+    """Drop this worker's remaining claims on ids so they can be retried right away."""
+    if not ids:
+        return
+    try:
+        session.execute(
+            update(AlertLog)
+            .where(AlertLog.id.in_(ids), AlertLog.claimed_by == _worker_id)
+            .values(claimed_by=None, claimed_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        print(f"[telegram_delivery] Could not release claims: {e}")
+
+
+def _run():
+    while True:
+        _wake.wait(TELEGRAM_POLL_INTERVAL)
+        _wake.clear()
+        try:
+            drain_once()
+        except Exception as e:
+            print(f"[telegram_delivery] Error draining queue: {e}")
+
+
+def start_worker():
+    """Start the background delivery worker if Telegram is configured."""
+    global _thread
+    if not telegram_configured():
+        return
+    if _thread is None:
+        with _start_lock:
+            if _thread is None:
+                _thread = threading.Thread(target=_run, name="telegram-delivery", daemon=True)
+                _thread.start()
+
+
+def wake():
+    """Ask the worker to drain the queue now (starting it if needed)."""
+    start_worker()
+    _wake.set()
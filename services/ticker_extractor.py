@@ -1,5 +1,7 @@
 import re
+import threading
 from tickers import TICKER_MAP, AMBIGUOUS_TICKERS
+from services.issuers import company_aliases, is_listed
 
 # Common uppercase words that are NOT tickers
 FALSE_POSITIVES = {
@@ -38,19 +40,84 @@ FALSE_POSITIVES = {
     "BRIEF", "CHART", "CLIMB", "DAILY", "EARLY", "FIRST",
     "FRESH", "GIVES", "GOING", "AHEAD", "MAJOR", "OFFER",
     "OTHER", "POINT", "PRICE", "READY", "REPORT",
+    "AP", "AFP", "UPI",  # wire-service credits, e.g. "NEW YORK (AP)"
 }
 
 _cashtag_re = re.compile(r"\$([A-Z]{1,5})\b")
 _upper_word_re = re.compile(r"\b([A-Z]{2,5})\b")
+# Symbols the text itself marks as tickers: "Acme Corp (ACME)", "(NYSE: ACME)", "NASDAQ: ACME"
+_symbol_context_re = re.compile(
+    r"\(\s*(?:[A-Z][A-Za-z]*\s*:\s*)?([A-Z]{1,5})\s*\)|\b(?:NASDAQ|NYSE|AMEX|OTC)\s*:\s*([A-Z]{1,5})\b"
+)
 
-# Build a reverse map: lowercase company name words -> ticker
-_company_to_ticker = {}
-for ticker, name in TICKER_MAP.items():
-    _company_to_ticker[name.lower()] = ticker
+# Word tokens; "&" and "." only join inside a token (AT&T, C3.ai, e.l.f)
+_token_re = re.compile(r"[a-z0-9]+(?:[&.][a-z0-9]+)*")
 
 
-def extract_tickers(text):
-    """Extract stock tickers from a headline/description using 3 tiers."""
+def tokenize(text_lower):
+    """Split lowercased text into word tokens (punctuation dropped)."""
+    return tuple(_token_re.findall(text_lower))
+
+
+# Trie key holding the tickers of names that end at a node; tokens are never empty
+_END = ""
+
+
+def _build_name_index(company_to_ticker):
+    """Index company names as a trie of word tokens.
+
+    Each node maps the next token to a child node; _END holds the tickers
+    of names ending there. Matching walks the trie from each text position
+    with one dict lookup per token, so cost grows with text length (times
+    the longest name matched) rather than with the number of names, and
+    matches always fall on word boundaries.
+    """
+    index = {}
+    for company_name, ticker in company_to_ticker.items():
+        if len(company_name) < 4:
+            continue
+        tokens = tokenize(company_name)
+        if not tokens:
+            continue
+        node = index
+        for tok in tokens:
+            node = node.setdefault(tok, {})
+        node.setdefault(_END, []).append(ticker)
+    return index
+
+
+_name_index = None
+_name_index_lock = threading.Lock()
+
+
+def _get_name_index():
+    """Build the company-name index from the issuer universe on first use."""
+    global _name_index
+    if _name_index is None:
+        with _name_index_lock:
+            if _name_index is None:
+                _name_index = _build_name_index(company_aliases())
+    return _name_index
+
+
+def _match_company_names(tokens, found):
+    """Add tickers for every indexed company name found in the token sequence."""
+    name_index = _get_name_index()
+    n = len(tokens)
+    for i in range(n):
+        node = name_index
+        for j in range(i, n):
+            node = node.get(tokens[j])
+            if node is None:
+                break
+            for ticker in node.get(_END, ()):
+                found[ticker] = True
+
+
+def extract_tickers(text, tokens=None):
+    """Extract stock tickers from a headline/description using 3 tiers.
+    tokens may be passed if the caller already ran tokenize(text.lower()).
+    """
     if not text:
         return []
 
@@ -59,10 +126,12 @@ def extract_tickers(text):
     # Tier 1: $CASHTAG pattern (highest confidence)
     for match in _cashtag_re.finditer(text):
         sym = match.group(1)
-        if sym in TICKER_MAP:
+        if sym in TICKER_MAP or is_listed(sym):
             found[sym] = True
 
-    # Tier 2: uppercase word matching (skip ambiguous + false positives)
+    # Tier 2: uppercase word matching against the curated map (skip ambiguous + false positives).
+    # Other listed symbols are ordinary words too often (NOW, CASH, GOLD) to match bare,
+    # so they need a cashtag or a symbol context like "Acme Corp (ACME)"
     for match in _upper_word_re.finditer(text):
         word = match.group(1)
         if word in FALSE_POSITIVES:
@@ -71,12 +140,15 @@ def extract_tickers(text):
             continue
         if word in TICKER_MAP:
             found[word] = True
+    for match in _symbol_context_re.finditer(text):
+        sym = match.group(1) or match.group(2)
+        if sym not in FALSE_POSITIVES and (sym in TICKER_MAP or is_listed(sym)):
+            found[sym] = True
 
-    # Tier 3: company name substring matching
-    text_lower = text.lower()
-    for company_name, ticker in _company_to_ticker.items():
-        if len(company_name) >= 4 and company_name in text_lower:
-            found[ticker] = True
+    # Tier 3: company name matching on word boundaries
+    if tokens is None:
+        tokens = tokenize(text.lower())
+    _match_company_names(tokens, found)
 
     return list(found.keys())
 
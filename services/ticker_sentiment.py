@@ -0,0 +1,156 @@
+"""
+Per-ticker rolling news sentiment.
+Each newly ingested article updates fixed time buckets per ticker (counts,
+score sum) and an exponentially weighted score, so an update costs
+O(new articles) and queries read a handful of bucket rows.
+Bucket rows are upserted with additive updates so concurrent ingests add up
+instead of overwriting each other. The EWMA terms in a bucket are weighted
+relative to its bucket_start (a scale shared by all of them, so their ratio
+is still the EWMA); within a bucket new scores are simply added.
+"""
+import math
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+from config import SENTIMENT_BUCKET_SECONDS, SENTIMENT_EWMA_HALFLIFE
+from database.connection import get_session
+from database.models import TickerSentimentBucket
+
+WINDOWS = {
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+}
+
+
+def _bucket_start(ts):
+    epoch = int(ts.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % SENTIMENT_BUCKET_SECONDS)
+
+
+def _decay(elapsed_seconds):
+    return math.exp(-math.log(2) * max(elapsed_seconds, 0) / SENTIMENT_EWMA_HALFLIFE)
+
+
+def record_articles(articles, now=None):
+    """Fold newly ingested, annotated articles into the per-ticker buckets.
+    Only pass articles that have not been recorded before.
+    """
+    now = now or datetime.now()
+    per_ticker = {}
+    for art in articles:
+        score = art.get("sentiment_score") or 0.0
+        label = art.get("sentiment")
+        for ticker in art.get("tickers", []):
+            agg = per_ticker.setdefault(ticker, [0, 0, 0, 0.0])
+            agg[0] += 1
+            agg[1] += label == "bullish"
+            agg[2] += label == "bearish"
+            agg[3] += score
+
+    if not per_ticker:
+        return
+
+    bucket = _bucket_start(now)
+    session = get_session()
+    try:
+        # Latest bucket per touched ticker carries the running EWMA state
+        latest_start = (
+            session.query(TickerSentimentBucket.ticker, func.max(TickerSentimentBucket.bucket_start).label("start"))
+            .filter(TickerSentimentBucket.ticker.in_(per_ticker))
+            .group_by(TickerSentimentBucket.ticker)
+            .subquery()
+        )
+        latest = {
+            row.ticker: row
+            for row in session.query(TickerSentimentBucket).join(
+                latest_start,
+                (TickerSentimentBucket.ticker == latest_start.c.ticker)
+                & (TickerSentimentBucket.bucket_start == latest_start.c.start),
+            )
+        }
+
+        # Weight of scores recorded now, relative to the bucket start
+        scale = 1 / _decay((now - bucket).total_seconds())
+        for ticker, (count, bullish, bearish, score_sum) in per_ticker.items():
+            num, den = score_sum * scale, count * scale
+            # A new bucket starts from the previous one's state, decayed to its start
+            carry_num = carry_den = 0.0
+            prev = latest.get(ticker)
+            if prev is not None and prev.bucket_start < bucket:
+                d = _decay((bucket - prev.bucket_start).total_seconds())
+                carry_num, carry_den = (prev.ewm_num or 0.0) * d, (prev.ewm_den or 0.0) * d
+
+            stmt = insert(TickerSentimentBucket).values(
+                ticker=ticker, bucket_start=bucket, count=count, bullish=bullish, bearish=bearish,
+                score_sum=score_sum, ewm_num=carry_num + num, ewm_den=carry_den + den, updated_at=now,
+            )
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=["ticker", "bucket_start"],
+                set_={
+                    "count": TickerSentimentBucket.count + count,
+                    "bullish": TickerSentimentBucket.bullish + bullish,
+                    "bearish": TickerSentimentBucket.bearish + bearish,
+                    "score_sum": TickerSentimentBucket.score_sum + score_sum,
+                    "ewm_num": TickerSentimentBucket.ewm_num + num,
+                    "ewm_den": TickerSentimentBucket.ewm_den + den,
+                    "updated_at": now,
+                },
+            ))
+
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def get_ticker_sentiment(ticker, window="24h"):
+    """Return bucketed sentiment and a summary for a ticker over a window."""
+    span = WINDOWS.get(window)
+    if span is None:
+        return {"error": f"Unknown window: {window} (use {', '.join(WINDOWS)})"}
+
+    now = datetime.now()
+    session = get_session()
+    try:
+        rows = (
+            session.query(TickerSentimentBucket)
+            .filter(
+                TickerSentimentBucket.ticker == ticker,
+                TickerSentimentBucket.bucket_start >= _bucket_start(now - span),
+            )
+            .order_by(TickerSentimentBucket.bucket_start)
+            .all()
+        )
+
+        buckets = [
+            {
+                "start": r.bucket_start.isoformat(),
+                "count": r.count,
+                "bullish": r.bullish,
+                "bearish": r.bearish,
+                "mean_score": round(r.score_sum / r.count, 3) if r.count else None,
+                "ewma_score": round(r.ewm_num / r.ewm_den, 3) if r.ewm_den else None,
+            }
+            for r in rows
+        ]
+
+        count = sum(r.count for r in rows)
+        score_sum = sum(r.score_sum for r in rows)
+        last = rows[-1] if rows else None
+        return {
+            "ticker": ticker,
+            "window": window,
+            "bucket_seconds": SENTIMENT_BUCKET_SECONDS,
+            "count": count,
+            "bullish": sum(r.bullish for r in rows),
+            "bearish": sum(r.bearish for r in rows),
+            "mean_score": round(score_sum / count, 3) if count else None,
+            "ewma_score": round(last.ewm_num / last.ewm_den, 3) if last and last.ewm_den else None,
+            "last_update": last.updated_at.isoformat() if last else None,
+            "buckets": buckets,
+        }
+    finally:
+        session.close()
@@ -0,0 +1,158 @@
+import io
+import json
+import os
+import sys
+import zipfile
+
+import pytest
+
+from services import companyfacts, fundamentals
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "companyfacts", "CIK0000320193.json")
+
+K22 = "0000320193-22-000108"
+K23 = "0000320193-23-000106"
+KA23 = "0000320193-24-000002"
+Q1 = "0000320193-24-000006"
+Q2 = "0000320193-24-000069"
+
+
+def _load():
+    with open(FIXTURE) as f:
+        return json.load(f)
+
+
+def _collect():
+    return companyfacts._collect(_load()["facts"]["us-gaap"].items())
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(fundamentals, "FUNDAMENTALS_DIR", str(tmp_path / "fundamentals"))
+    return tmp_path
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / "companyfacts.zip"
+    with zipfile.ZipFile(path, "w") as z:
+        z.write(FIXTURE, "CIK0000320193.json")
+        z.writestr("CIK0000000042.json", json.dumps({"cik": 42, "facts": {}}))
+        z.writestr("README.txt", "not a filer")
+    return str(path)
+
+
+def test_collect_annual_keeps_year_durations_and_latest_filing():
+    revenues = _collect()["annual"]["duration"]["Revenues"]
+
+    # The 3-month fourth quarter reported in the 10-K is not an annual period
+    assert sorted(revenues) == ["2022-09-24", "2023-09-30"]
+    # Reported again in the next 10-K: the later filing wins
+    assert revenues["2022-09-24"] == ("2023-11-03", 400.0, K23)
+    # Restated by the 10-K/A
+    assert revenues["2023-09-30"] == ("2024-01-20", 383.0, KA23)
+
+
+def test_collect_quarterly_keeps_three_month_durations():
+    found = _collect()["quarterly"]
+
+    # The six-month year-to-date figure in the Q2 10-Q is dropped
+    assert found["duration"]["Revenues"] == {
+        "2023-12-30": ("2024-02-02", 120.0, Q1),
+        "2024-03-30": ("2024-05-03", 90.0, Q2),
+    }
+    assert found["instant"]["Assets"]["2023-12-30"] == ("2024-02-02", 353.0, Q1)
+
+
+def test_collect_ignores_unmapped_concepts_and_other_units():
+    found = _collect()
+    concepts = set(found["annual"]["duration"]) | set(found["annual"]["instant"])
+
+    assert "AccountsPayableCurrent" not in concepts
+    assert found["annual"]["duration"]["EarningsPerShareBasic"]["2023-09-30"][1] == 6.16
+
+
+def test_rows_prefer_concept_order_and_attach_instants():
+    rows, accessions = companyfacts._rows(_collect()["annual"])
+
+    assert [end for end, _ in rows] == ["2022-09-24", "2023-09-30"]
+    latest = rows[1][1]
+    # Revenues is preferred over SalesRevenueNet
+    assert latest["revenue"] == 383.0
+    assert latest["total_assets"] == 352.0
+    assert latest["net_margin"] == round(97.0 / 383.0 * 100, 2)
+    assert latest["roe"] == round(97.0 / 62.0 * 100, 2)
+    assert latest["free_cash_flow"] == 99.0
+    # Base metrics with no facts are present as None
+    assert latest["inventory"] is None
+    assert accessions == {K22, K23, KA23}
+
+
+def test_rows_quarterly_skip_year_end_balances():
+    rows, accessions = companyfacts._rows(_collect()["quarterly"])
+
+    assert [end for end, _ in rows] == ["2023-12-30", "2024-03-30"]
+    assert rows[0][1]["total_assets"] == 353.0
+    assert rows[1][1]["total_assets"] is None
+    assert accessions == {Q1, Q2}
+
+
+def test_add_growth_only_between_consecutive_years():
+    rows = [
+        ("2021-09-25", {"revenue": 100.0, "net_income": 10.0}),
+        ("2022-09-24", {"revenue": 120.0, "net_income": 9.0}),
+        ("2024-09-28", {"revenue": 150.0, "net_income": 12.0}),
+    ]
+    companyfacts._add_growth(rows)
+
+    assert rows[1][1]["revenue_growth"] == 20.0
+    assert rows[1][1]["earnings_growth"] == -10.0
+    # Two years apart: no year-over-year figure
+    assert "revenue_growth" not in rows[2][1]
+    assert "revenue_growth" not in rows[0][1]
+
+
+def test_json_fallback_without_ijson(monkeypatch):
+    monkeypatch.setitem(sys.modules, "ijson", None)
+    with open(FIXTURE, "rb") as f:
+        concepts = dict(companyfacts._iter_concepts(f))
+    assert set(concepts) == set(_load()["facts"]["us-gaap"])
+
+
+def test_ijson_streaming_matches_json():
+    pytest.importorskip("ijson")
+    with open(FIXTURE, "rb") as f:
+        streamed = companyfacts._collect(companyfacts._iter_concepts(f))
+    assert streamed == _collect()
+
+
+def test_ingest_companyfacts(store, archive, monkeypatch):
+    monkeypatch.setattr(companyfacts, "ticker_for_cik", {320193: "EXMP"}.get)
+
+    stats = companyfacts.ingest_companyfacts(archive)
+
+    assert stats == {"companies": 1, "unlisted": 1, "failed": 0, "periods": 4}
+    history = fundamentals.get_history("EXMP", "annual", ["revenue", "revenue_growth"])
+    assert history["periods"] == ["2022-09-24", "2023-09-30"]
+    assert history["series"]["revenue"] == [400.0, 383.0]
+    assert history["series"]["revenue_growth"] == [None, -4.25]
+    assert fundamentals.get_history("EXMP", "quarterly", ["revenue"])["series"]["revenue"] == [120.0, 90.0]
+    assert set(fundamentals.read_manifest("EXMP")["annual"]["accessions"]) == {K22, K23, KA23}
+
+    # Nothing new on a second run: no frequency is rewritten
+    assert companyfacts.ingest_companyfacts(archive)["periods"] == 0
+
+
+def test_ingest_counts_bad_members(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(companyfacts, "ticker_for_cik", lambda cik: "BAD")
+    path = tmp_path / "bad.zip"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("CIK0000000001.json", "{not json")
+
+    assert companyfacts.ingest_companyfacts(str(path))["failed"] == 1
+
+
+def test_ingest_company_reads_file_objects(store):
+    with open(FIXTURE, "rb") as f:
+        data = f.read()
+    assert companyfacts.ingest_company("EXMP", io.BytesIO(data)) == 4
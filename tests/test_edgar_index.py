@@ -0,0 +1,134 @@
+import os
+from datetime import date
+
+import pytest
+
+from services import edgar_index
+
+INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "edgar_index")
+
+
+def _read(*parts):
+    with open(os.path.join(INDEX_DIR, "edgar", *parts), encoding="latin-1") as f:
+        return f.read()
+
+
+@pytest.fixture
+def local_index(monkeypatch):
+    monkeypatch.setattr(edgar_index, "EDGAR_INDEX_DIR", INDEX_DIR)
+
+
+def test_parse_daily_index():
+    entries = list(edgar_index.parse_form_index(_read("daily-index", "2024", "QTR1", "form.20240102.idx")))
+
+    assert [(e["form"], e["cik"], e["accession_no"]) for e in entries] == [
+        ("4", 1000001, "0001209191-24-000101"),
+        ("4", 1900001, "0001209191-24-000101"),
+        ("4", 1000002, "0001000002-24-000007"),
+        ("4/A", 1000002, "0001000002-24-000008"),
+    ]
+    assert entries[0]["company"] == "ACME CORP"
+    assert entries[0]["filing_date"] == "2024-01-02"
+
+
+def test_parse_full_index():
+    entries = list(edgar_index.parse_form_index(_read("full-index", "2024", "QTR1", "form.idx")))
+
+    assert [(e["form"], e["company"], e["filing_date"]) for e in entries] == [
+        ("4", "ACME CORP", "2024-01-02"),
+        ("4", "DOE JANE", "2024-01-02"),
+        ("4", "INITECH  HOLDINGS", "2024-02-15"),
+        ("4/A", "GLOBEX INC", "2024-03-28"),
+        ("4", "LATE FILER LLC", "2024-04-01"),
+    ]
+
+
+def test_parse_other_forms():
+    text = _read("daily-index", "2024", "QTR1", "form.20240102.idx")
+    entries = list(edgar_index.parse_form_index(text, forms=("SC 13G", "424B2")))
+
+    assert [(e["form"], e["company"]) for e in entries] == [
+        ("424B2", "BIG BANK & CO, N.A."),
+        ("SC 13G", "INITECH  HOLDINGS"),
+    ]
+
+
+def test_index_paths():
+    assert edgar_index.index_paths(date(2024, 1, 1), date(2024, 1, 2)) == [
+        "edgar/daily-index/2024/QTR1/form.20240101.idx",
+        "edgar/daily-index/2024/QTR1/form.20240102.idx",
+    ]
+    assert edgar_index.index_paths(date(2023, 12, 1), date(2024, 4, 1), quarterly=True) == [
+        "edgar/full-index/2023/QTR4/form.idx",
+        "edgar/full-index/2024/QTR1/form.idx",
+        "edgar/full-index/2024/QTR2/form.idx",
+    ]
+
+
+def test_discover_daily_dedupes_issuer_and_owner_listings(local_index):
+    # 2024-01-01 has no index file (holiday) and is skipped
+    entries = edgar_index.discover_form4(date(2024, 1, 1), date(2024, 1, 2))
+
+    assert sorted(e["accession_no"] for e in entries) == [
+        "0001000002-24-000007", "0001000002-24-000008", "0001209191-24-000101",
+    ]
+    # The first listing (the issuer) is kept
+    shared = next(e for e in entries if e["accession_no"] == "0001209191-24-000101")
+    assert shared["cik"] == 1000001
+
+
+def test_discover_quarterly_filters_dates(local_index):
+    entries = edgar_index.discover_form4(date(2024, 1, 15), date(2024, 3, 31), quarterly=True)
+
+    assert sorted(e["accession_no"] for e in entries) == ["0001000002-24-000030", "0001000004-24-000020"]
+
+
+def test_ingest_skips_known_and_stores_parsed(local_index, monkeypatch):
+    stored = []
+    monkeypatch.setattr(edgar_index, "known_accessions", lambda accessions: {"0001000002-24-000007"})
+    monkeypatch.setattr(edgar_index, "store_trades", lambda trades: stored.extend(trades))
+
+    def parse(entry):
+        if entry["form"] == "4/A":
+            raise ValueError("bad XML")
+        return [{"accession_no": entry["accession_no"], "txn_index": i} for i in range(2)]
+
+    monkeypatch.setattr(edgar_index, "_parse_entry", parse)
+    stats = edgar_index.ingest_form4(date(2024, 1, 2), date(2024, 1, 2), workers=2)
+
+    assert stats == {"discovered": 3, "skipped": 1, "parsed": 1, "failed": 1, "trades": 2}
+    assert {t["accession_no"] for t in stored} == {"0001209191-24-000101"}
+
+
+class _Response:
+    def __init__(self, status_code, content=b""):
+        self.status_code = status_code
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+@pytest.fixture
+def remote_index(monkeypatch):
+    monkeypatch.setattr(edgar_index, "EDGAR_INDEX_DIR", "")
+    monkeypatch.setattr(edgar_index, "EDGAR_IDENTITY", "Test test@example.com")
+    monkeypatch.setattr(edgar_index.sec_limiter, "acquire", lambda: None)
+
+
+def test_download_missing_index_is_skipped(remote_index, monkeypatch):
+    monkeypatch.setattr(edgar_index._session, "get", lambda url, **kw: _Response(404))
+    assert edgar_index._read_index("edgar/daily-index/2024/QTR1/form.20240101.idx") is None
+
+
+def test_download_refused_raises(remote_index, monkeypatch):
+    monkeypatch.setattr(edgar_index._session, "get", lambda url, **kw: _Response(403))
+    with pytest.raises(RuntimeError, match="403"):
+        edgar_index.discover_form4(date(2024, 1, 2), date(2024, 1, 2))
+
+
+def test_download_requires_identity(remote_index, monkeypatch):
+    monkeypatch.setattr(edgar_index, "EDGAR_IDENTITY", "")
+    with pytest.raises(RuntimeError, match="EDGAR_IDENTITY"):
+        edgar_index._read_index("edgar/daily-index/2024/QTR1/form.20240102.idx")
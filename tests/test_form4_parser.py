@@ -0,0 +1,65 @@
+import pytest
+
+from services import form4_parser
+from services.form4_parser import form4_trades, issuer_ticker, parse_form4_xml
+
+XML = """<ownershipDocument>
+<issuer><issuerCik>{cik}</issuerCik><issuerName>Acme Corp</issuerName>
+<issuerTradingSymbol>{symbol}</issuerTradingSymbol></issuer>
+<reportingOwner><reportingOwnerId><rptOwnerName>Jane Doe</rptOwnerName></reportingOwnerId>
+<reportingOwnerRelationship><isDirector>1</isDirector></reportingOwnerRelationship></reportingOwner>
+<nonDerivativeTable><nonDerivativeTransaction>
+<transactionDate><value>2024-01-02</value></transactionDate>
+<transactionCoding><transactionCode>P</transactionCode></transactionCoding>
+<transactionAmounts><transactionShares><value>100</value></transactionShares>
+<transactionPricePerShare><value>12.5</value></transactionPricePerShare>
+<transactionAcquiredDisposedCode><value>A</value></transactionAcquiredDisposedCode></transactionAmounts>
+</nonDerivativeTransaction></nonDerivativeTable>
+</ownershipDocument>"""
+
+
+@pytest.fixture
+def listed(monkeypatch):
+    monkeypatch.setattr(form4_parser, "ticker_for_cik", lambda cik: {1000001: "ACME"}.get(int(cik)))
+
+
+def _doc(cik="0001000001", symbol="ACME"):
+    return parse_form4_xml(XML.format(cik=cik, symbol=symbol))
+
+
+def test_parse_form4_xml():
+    doc = _doc()
+
+    assert (doc["ticker"], doc["issuer_cik"], doc["owner_name"], doc["owner_title"]) == \
+        ("ACME", "0001000001", "Jane Doe", "Director")
+    assert doc["transactions"] == [{
+        "date": "2024-01-02", "code": "P", "trade_type": "Purchase",
+        "shares": 100, "price": 12.5, "acquired_disposed": "A",
+    }]
+
+
+@pytest.mark.parametrize("symbol", ["acme", "ACMEOLD", "NONE", "", "ACME, ACMEB"])
+def test_issuer_ticker_prefers_listed_cik(listed, symbol):
+    assert issuer_ticker(_doc(symbol=symbol)) == "ACME"
+
+
+@pytest.mark.parametrize("symbol, ticker", [
+    ("brk.b", "BRK-B"), ("GOOG, GOOGL", "GOOG"), (" xyz ", "XYZ"),
+    ("NONE", None), ("N/A", None), ("", None), ("$$$", None),
+])
+def test_issuer_ticker_cleans_unlisted_symbol(listed, symbol, ticker):
+    assert issuer_ticker(_doc(cik="0009999999", symbol=symbol)) == ticker
+
+
+def test_trades_stored_under_issuer_ticker(listed):
+    trades = form4_trades(_doc(symbol="acme old"), accession_no="0001-24-1")
+
+    assert [(t["ticker"], t["value"], t["txn_index"]) for t in trades] == [("ACME", 1250.0, 0)]
+    assert form4_trades(_doc(cik="", symbol="NONE")) == []
+
+
+def test_trades_filtered_by_issuer_cik(listed):
+    doc = _doc(symbol="GOOG")
+
+    assert [t["ticker"] for t in form4_trades(doc, ticker="GOOGL", issuer_cik=1000001)] == ["GOOGL"]
+    assert form4_trades(doc, ticker="GOOGL", issuer_cik=1652044) == []
@@ -0,0 +1,39 @@
+import pytest
+
+from services import ticker_extractor
+from services.ticker_extractor import extract_tickers
+
+
+@pytest.fixture
+def names(monkeypatch):
+    index = ticker_extractor._build_name_index({
+        "first solar": "FSLR",
+        "first american financial": "FAF",
+        "bank of america": "BAC",
+        "bank of america preferred": "BACP",
+        "at&t": "T",
+    })
+    monkeypatch.setattr(ticker_extractor, "_name_index", index)
+
+
+def _names(text):
+    found = {}
+    ticker_extractor._match_company_names(ticker_extractor.tokenize(text.lower()), found)
+    return list(found)
+
+
+def test_names_sharing_a_first_word(names):
+    assert _names("First Solar and First American Financial rally; first quarter beats") == ["FSLR", "FAF"]
+
+
+def test_longer_name_also_matches_its_prefix(names):
+    assert _names("Bank of America preferred shares") == ["BAC", "BACP"]
+
+
+def test_names_match_on_word_boundaries(names):
+    assert _names("First Solaris, first american, bank of americas") == []
+    assert _names("AT&T outage") == ["T"]
+
+
+def test_extract_tickers_skips_bare_listed_words(names):
+    assert extract_tickers("CASH piles up as GOLD rises") == []